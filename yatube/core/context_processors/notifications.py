@@ -0,0 +1,9 @@
+from posts.notifications import unread_count
+
+
+def unread_notifications(request):
+    if not request.user.is_authenticated:
+        return {}
+    return {
+        'unread_notifications': unread_count(request.user.pk)
+    }
@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import Counter
+
+
+class BufferedCounter:
+    """Потокобезопасные счётчики в памяти процесса.
+
+    Накопленные значения периодически забирает drain(), чтобы записать
+    их в базу одним действием вместо UPDATE на каждое событие.
+    """
+
+    def __init__(self, flush_interval):
+        self.flush_interval = flush_interval
+        self.lock = threading.Lock()
+        self.last_flush = time.monotonic()
+        self.counts = Counter()
+        self.timer = None
+
+    def add(self, key, amount=1):
+        with self.lock:
+            self.counts[key] += amount
+
+    def pending(self, key):
+        return self.counts.get(key, 0)
+
+    def due(self):
+        return time.monotonic() - self.last_flush >= self.flush_interval
+
+    def schedule(self, callback):
+        """Вызывает callback через flush_interval в фоновом потоке.
+
+        Пока таймер ждёт, новый не заводится. Без него буфер простоявшего
+        процесса сбрасывался бы только со следующим событием.
+        """
+        with self.lock:
+            if self.timer is not None:
+                return
+            self.timer = threading.Timer(
+                self.flush_interval, self._fire, (callback,)
+            )
+            self.timer.daemon = True
+            self.timer.start()
+
+    def _fire(self, callback):
+        with self.lock:
+            self.timer = None
+        callback()
+
+    def drain(self):
+        with self.lock:
+            counts, self.counts = self.counts, Counter()
+            self.last_flush = time.monotonic()
+        return counts
+
+
+class RingCounter(BufferedCounter):
+    """Счётчики по временным корзинам в кольцевом буфере.
+
+    Корзина — интервал в width секунд. Буфер хранит size последних
+    корзин; несброшенная корзина, место которой занимает новая,
+    откладывается до drain(), поэтому после простоя процесса события
+    не теряются.
+    """
+
+    def __init__(self, size, width, flush_interval):
+        super().__init__(flush_interval)
+        self.width = width
+        self.slots = [(None, Counter()) for _ in range(size)]
+        self.evicted = Counter()
+
+    def bucket(self, now=None):
+        return int((now or time.time()) // self.width)
+
+    def add(self, key, amount=1, now=None):
+        bucket = self.bucket(now)
+        index = bucket % len(self.slots)
+        with self.lock:
+            slot_bucket, counts = self.slots[index]
+            if slot_bucket != bucket:
+                if slot_bucket is not None:
+                    self.evicted.update({
+                        (slot_bucket, slot_key): amount
+                        for slot_key, amount in counts.items()
+                    })
+                counts = Counter()
+                self.slots[index] = (bucket, counts)
+            counts[key] += amount
+
+    def pending(self, key):
+        return sum(counts.get(key, 0) for _, counts in self.slots) + sum(
+            amount for (_, evicted_key), amount in self.evicted.items()
+            if evicted_key == key
+        )
+
+    def drain(self):
+        """Возвращает {(корзина, ключ): количество} и очищает буфер."""
+        with self.lock:
+            slots, evicted = self.slots, self.evicted
+            self.slots = [(None, Counter()) for _ in slots]
+            self.evicted = Counter()
+            self.last_flush = time.monotonic()
+        evicted.update({
+            (bucket, key): amount
+            for bucket, counts in slots if bucket is not None
+            for key, amount in counts.items()
+        })
+        return evicted
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta, timezone
+
+from django.db.models import Q
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+
+def encode_cursor(moment, pk):
+    """Курсор ленты: микросекунды даты и pk последней показанной записи."""
+    return f'{(moment - EPOCH) // MICROSECOND}_{pk}'
+
+
+def decode_cursor(value):
+    """(дата, pk) из курсора; None, если курсора нет или он испорчен."""
+    try:
+        micros, pk = (int(part) for part in value.split('_'))
+        return EPOCH + micros * MICROSECOND, pk
+    except (AttributeError, ValueError, OverflowError):
+        return None
+
+
+def after_cursor(queryset, cursor, date_field='pub_date', pk_field='pk'):
+    """Записи старше курсора, от новых к старым.
+
+    Индекс по (…, дата, pk) позволяет базе начать чтение сразу с позиции
+    курсора, поэтому глубокие страницы стоят столько же, сколько первая.
+    """
+    position = decode_cursor(cursor)
+    if position is not None:
+        moment, pk = position
+        queryset = queryset.filter(
+            Q(**{f'{date_field}__lt': moment})
+            | Q(**{date_field: moment, f'{pk_field}__lt': pk})
+        )
+    return queryset.order_by(f'-{date_field}', f'-{pk_field}')
+
+
+def split_page(rows, size, date_field='pub_date', pk_field='pk'):
+    """Из size + 1 записей — страница и курсор следующей (или None)."""
+    if len(rows) <= size:
+        return rows, None
+    rows = rows[:size]
+    last = rows[-1]
+    return rows, encode_cursor(
+        getattr(last, date_field), getattr(last, pk_field)
+    )
+
+
+def keyset_page(queryset, cursor, size, date_field='pub_date',
+                pk_field='pk'):
+    """Страница ленты по ключу (дата, pk) без OFFSET.
+
+    Возвращает записи и курсор следующей страницы (None на последней).
+    """
+    rows = list(
+        after_cursor(queryset, cursor, date_field, pk_field)[:size + 1]
+    )
+    return split_page(rows, size, date_field, pk_field)
@@ -0,0 +1,244 @@
+import hashlib
+import pickle
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import Http404
+from django.shortcuts import _get_queryset
+
+from .bloom import BloomFilter
+from .routers import primary_reads
+
+# Запись кэша «такого объекта нет».
+MISSING = b''
+
+# Бэкенды, содержимое которых видно только своему процессу.
+PROCESS_LOCAL_CACHES = (LocMemCache, DummyCache)
+
+
+class LocalLRU:
+    """Небольшой потокобезопасный LRU в памяти процесса с TTL записей.
+
+    Хранит байты pickle, а не объекты: каждый запрос получает свою
+    копию и не может испортить запись для соседних потоков.
+    """
+
+    def __init__(self, size, timeout):
+        self.size = size
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.timeout, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.size:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+local = LocalLRU(
+    settings.ENTITY_CACHE_LOCAL_SIZE, settings.ENTITY_CACHE_LOCAL_SECONDS
+)
+
+
+def entity_key(model, field, value):
+    digest = hashlib.md5(str(value).encode()).hexdigest()
+    return f'entity:{model._meta.label_lower}:{field}:{digest}'
+
+
+class ExistenceFilter:
+    """Bloom-фильтр существующих значений поля в памяти процесса.
+
+    Создание объекта меняет поколение в общем кэше. Фильтр с другим
+    поколением устарел: на его «нет» полагаться нельзя, пока он не
+    будет перестроен, а перестраивается он не чаще раза в
+    ENTITY_BLOOM_REBUILD_SECONDS. Поколение сверяется не чаще раза
+    в ENTITY_CACHE_LOCAL_SECONDS, как и обновляется LRU.
+    """
+
+    def __init__(self, model, field):
+        self.key = generation_key(model, field)
+        self.checked = self.built = time.monotonic()
+        before = current_generation(self.key)
+        queryset = model._default_manager.using('default')
+        self.filter = self.load(queryset, field)
+        # Поколение сверяется после загрузки: если за это время появился
+        # новый объект, фильтр сразу считается устаревшим.
+        after = cache.get(self.key)
+        self.generation = after if after == before else None
+
+    def load(self, queryset, field):
+        bloom = BloomFilter(
+            queryset.count() * 2 + settings.ENTITY_BLOOM_MIN_CAPACITY,
+            settings.ENTITY_BLOOM_ERROR_RATE,
+        )
+        for value in queryset.values_list(field, flat=True).iterator():
+            bloom.add(value)
+        return bloom
+
+    def is_current(self):
+        if self.generation is None:
+            return False
+        now = time.monotonic()
+        if now - self.checked < settings.ENTITY_CACHE_LOCAL_SECONDS:
+            return True
+        if cache.get(self.key) == self.generation:
+            self.checked = now
+            return True
+        return False
+
+    def is_due(self):
+        return (
+            time.monotonic() - self.built
+            >= settings.ENTITY_BLOOM_REBUILD_SECONDS
+        )
+
+
+filters = {}
+rebuild_lock = threading.Lock()
+
+
+def generation_key(model, field):
+    return f'entity_bloom:{model._meta.label_lower}:{field}'
+
+
+def current_generation(key):
+    cache.add(key, uuid.uuid4().hex, None)
+    return cache.get(key)
+
+
+def cache_is_shared():
+    return not isinstance(caches['default'], PROCESS_LOCAL_CACHES)
+
+
+def may_exist(queryset, field, value):
+    """False, только если объекта с таким значением поля точно нет.
+
+    Фильтр ведётся для полей из ENTITY_BLOOM_FIELDS, для остальных
+    ответ всегда True. Устаревание фильтра видно только через общий
+    кэш: с кэшем в памяти процесса другие процессы не узнают о новых
+    объектах, поэтому фильтр не используется и ответ всегда True.
+    """
+    label = queryset.model._meta.label_lower
+    if settings.ENTITY_BLOOM_FIELDS.get(label) != field:
+        return True
+    if not cache_is_shared():
+        return True
+    bloom = filters.get(label)
+    if bloom is None or not bloom.is_current():
+        if bloom is not None and not bloom.is_due():
+            return True
+        # Перестраивает один поток; остальные пока идут обычным путём.
+        if not rebuild_lock.acquire(blocking=False):
+            return True
+        try:
+            bloom = filters[label] = ExistenceFilter(queryset.model, field)
+        finally:
+            rebuild_lock.release()
+        if bloom.generation is None:
+            return True
+    return str(value) in bloom.filter
+
+
+def entity_created(model, field, value):
+    """Появилось новое значение поля: фильтры других процессов устарели.
+
+    Фильтр своего процесса дополняется сразу, поэтому только что
+    созданный объект доступен в этом процессе без задержки.
+    """
+    label = model._meta.label_lower
+    if settings.ENTITY_BLOOM_FIELDS.get(label) != field:
+        return
+    cache.set(generation_key(model, field), uuid.uuid4().hex, None)
+    bloom = filters.get(label)
+    if bloom is not None:
+        bloom.filter.add(str(value))
+
+
+def get_cached_object(klass, **lookup):
+    """Объект по одному уникальному полю через LRU процесса и общий кэш.
+
+    klass — модель, менеджер или queryset, как у get_object_or_404;
+    база читается только при промахе обоих кэшей. None — объекта нет.
+    Для моделей из ENTITY_CACHE_FIELDS кэшируются только эти поля.
+    Отсутствие тоже кэшируется на ENTITY_NEGATIVE_SECONDS, а значения,
+    которых нет в bloom-фильтре, отсекаются без обращения к кэшу и базе.
+    """
+    (field, value), = lookup.items()
+    queryset = _get_queryset(klass)
+    key = entity_key(queryset.model, field, value)
+    data = local.get(key)
+    if data is None:
+        if not may_exist(queryset, field, value):
+            return None
+        data = cache.get(key)
+        if data is not None:
+            local.set(key, data)
+    if data == MISSING:
+        return None
+    if data is not None:
+        return pickle.loads(data)
+    fields = settings.ENTITY_CACHE_FIELDS.get(
+        queryset.model._meta.label_lower
+    )
+    if fields:
+        queryset = queryset.only(*fields)
+    # Запись попадёт в общий кэш, поэтому читается с основной базы:
+    # отставшая реплика вернула бы данные до только что сброшенной правки.
+    with primary_reads():
+        instance = queryset.filter(**lookup).first()
+    if instance is None:
+        cache.set(key, MISSING, settings.ENTITY_NEGATIVE_SECONDS)
+        local.set(key, MISSING)
+        return None
+    data = pickle.dumps(instance, pickle.HIGHEST_PROTOCOL)
+    cache.set(key, data, settings.ENTITY_CACHE_SECONDS)
+    local.set(key, data)
+    return instance
+
+
+def get_cached_object_or_404(klass, **lookup):
+    instance = get_cached_object(klass, **lookup)
+    if instance is None:
+        raise Http404(
+            f'{_get_queryset(klass).model._meta.object_name} не найден'
+        )
+    return instance
+
+
+def forget(model, field, *values):
+    """Сбрасывает записи модели по значениям поля.
+
+    LRU других процессов очищается по своему короткому TTL.
+    """
+    keys = [entity_key(model, field, value) for value in values]
+    cache.delete_many(keys)
+    for key in keys:
+        local.delete(key)
@@ -0,0 +1,43 @@
+import time
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+from django.urls import resolve
+
+from core.middleware.compression import gzip_bytes
+
+
+class Command(BaseCommand):
+    help = (
+        'Рендерит страницы для анонимного пользователя и сравнивает '
+        'уровни gzip: сколько байт экономится и сколько стоит сжатие.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', default=['/', '/group/'])
+        parser.add_argument(
+            '--levels', type=int, nargs='+', default=[1, 6, 9]
+        )
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def handle(self, *args, **options):
+        factory = RequestFactory()
+        for path in options['paths']:
+            request = factory.get(path)
+            request.user = AnonymousUser()
+            match = resolve(path)
+            content = match.func(request, *match.args, **match.kwargs).content
+            self.stdout.write(f'{path}: {len(content)} байт')
+            for level in options['levels']:
+                started = time.perf_counter()
+                for _ in range(options['repeat']):
+                    compressed = gzip_bytes(content, level)
+                elapsed = (time.perf_counter() - started) / options['repeat']
+                saved = 1 - len(compressed) / len(content)
+                self.stdout.write(
+                    f'  уровень {level}: {len(compressed):7} байт, '
+                    f'экономия {saved:6.1%}, '
+                    f'{elapsed * 1_000_000:7.0f} мкс на ответ, '
+                    f'{len(content) / elapsed / 1_000_000:6.1f} МБ/с'
+                )
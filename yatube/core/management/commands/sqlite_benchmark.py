@@ -0,0 +1,110 @@
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.db import apply_pragmas
+
+SCHEMA = (
+    'CREATE TABLE post ('
+    'id INTEGER PRIMARY KEY, author_id INTEGER, text TEXT, pub_date REAL)'
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность параллельного чтения и записи '
+        'SQLite с настройками по умолчанию и с SQLITE_PRAGMAS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=1)
+        parser.add_argument('--seconds', type=float, default=3.0)
+        parser.add_argument('--rows', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        for title, pragmas in (
+            ('по умолчанию', {}),
+            ('SQLITE_PRAGMAS', settings.SQLITE_PRAGMAS),
+        ):
+            reads, writes, errors = self.run(pragmas, options)
+            seconds = options['seconds']
+            self.stdout.write(
+                f'{title:>15}: чтений {reads / seconds:9.0f}/с, '
+                f'записей {writes / seconds:7.0f}/с, '
+                f'ошибок блокировки {errors}'
+            )
+
+    def connect(self, path, pragmas):
+        connection = sqlite3.connect(path, timeout=5, check_same_thread=False)
+        apply_pragmas(connection, pragmas)
+        return connection
+
+    def run(self, pragmas, options):
+        handle, path = tempfile.mkstemp(suffix='.sqlite3')
+        os.close(handle)
+        try:
+            connection = self.connect(path, pragmas)
+            connection.execute(SCHEMA)
+            connection.execute('CREATE INDEX post_date ON post (pub_date)')
+            connection.executemany(
+                'INSERT INTO post (author_id, text, pub_date) '
+                'VALUES (?, ?, ?)',
+                ((i % 100, 'текст ' * 20, i) for i in range(options['rows']))
+            )
+            connection.commit()
+            connection.close()
+            return self.measure(path, pragmas, options)
+        finally:
+            for suffix in ('', '-wal', '-shm'):
+                if os.path.exists(path + suffix):
+                    os.remove(path + suffix)
+
+    def measure(self, path, pragmas, options):
+        counters = {'reads': 0, 'writes': 0, 'errors': 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + options['seconds']
+
+        def read(connection):
+            connection.execute(
+                'SELECT id, text FROM post ORDER BY pub_date DESC LIMIT 10'
+            ).fetchall()
+
+        def write(connection):
+            connection.execute(
+                'INSERT INTO post (author_id, text, pub_date) '
+                'VALUES (?, ?, ?)', (1, 'новый пост', time.time())
+            )
+            connection.commit()
+
+        def worker(operation, counter):
+            connection = self.connect(path, pragmas)
+            done = errors = 0
+            while time.monotonic() < deadline:
+                try:
+                    operation(connection)
+                    done += 1
+                except sqlite3.OperationalError:
+                    connection.rollback()
+                    errors += 1
+            with lock:
+                counters[counter] += done
+                counters['errors'] += errors
+
+        threads = [
+            threading.Thread(target=worker, args=(read, 'reads'))
+            for _ in range(options['readers'])
+        ] + [
+            threading.Thread(target=worker, args=(write, 'writes'))
+            for _ in range(options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return counters['reads'], counters['writes'], counters['errors']
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = 'Обслуживание SQLite: ANALYZE, VACUUM и контрольная точка WAL.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('--analyze', action='store_true')
+        parser.add_argument('--vacuum', action='store_true')
+        parser.add_argument('--checkpoint', action='store_true')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'sqlite':
+            raise CommandError('Команда работает только с SQLite.')
+        steps = [
+            name for name in ('analyze', 'vacuum', 'checkpoint')
+            if options[name]
+        ] or ['analyze', 'checkpoint']
+        with connection.cursor() as cursor:
+            for step in steps:
+                started = time.monotonic()
+                result = getattr(self, step)(cursor)
+                self.stdout.write(
+                    f'{step}: {time.monotonic() - started:.2f} с {result}'
+                )
+
+    def analyze(self, cursor):
+        cursor.execute('ANALYZE')
+        return ''
+
+    def vacuum(self, cursor):
+        cursor.execute('VACUUM')
+        return ''
+
+    def checkpoint(self, cursor):
+        cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        busy, log_pages, checkpointed = cursor.fetchone()
+        return f'(страниц в журнале: {log_pages}, перенесено: {checkpointed})'
@@ -0,0 +1,93 @@
+import re
+from hashlib import blake2b
+
+from django.conf import settings
+from django.core.cache import cache
+from django.urls import NoReverseMatch, reverse
+from django.utils.html import escape, linebreaks
+
+# Увеличивается при изменении правил, после чего запускается rerender_text.
+VERSION = 2
+HASHTAG = r'(?<![\w&#])#(?P<tag>\w{1,100})(?!\w)'
+MENTION = r'(?<![\w@])@(?P<mention>\w(?:[\w.+-]{0,148}\w)?)'
+TOKEN = re.compile(
+    r'`(?P<code>[^`\n]+)`'
+    r'|(?P<url>https?://[^\s<>"`]*[^\s<>"`.,:;!?)\]\'])'
+    rf'|{HASHTAG}|{MENTION}'
+)
+INLINE = (
+    (re.compile(r'\*\*(?=\S)([^*\n]+?)\*\*'), r'<strong>\1</strong>'),
+    (re.compile(r'(?<![\w*])\*(?=\S)([^*\n]+?)\*(?![\w*])'), r'<em>\1</em>'),
+    (re.compile(r'(?<!\w)_(?=\S)([^_\n]+?)_(?!\w)'), r'<em>\1</em>'),
+)
+
+
+def _inline(text):
+    text = escape(text)
+    for pattern, replacement in INLINE:
+        text = pattern.sub(replacement, text)
+    return text
+
+
+def _tokens(text, kind):
+    return (
+        match.group(kind) for match in TOKEN.finditer(text)
+        if match.lastgroup == kind
+    )
+
+
+def hashtags(text):
+    """Хэштеги в нижнем регистре; #якорь в ссылке или коде не считается."""
+    return {tag.lower() for tag in _tokens(text, 'tag')}
+
+
+def mentions(text):
+    """Имена пользователей, упомянутых через @."""
+    return set(_tokens(text, 'mention'))
+
+
+def _link(url_name, argument, text):
+    try:
+        url = reverse(settings.MARKUP_URLS[url_name], args=(argument,))
+    except NoReverseMatch:
+        return escape(text)
+    return f'<a href="{escape(url)}">{escape(text)}</a>'
+
+
+def _token(match):
+    if match.lastgroup == 'code':
+        return f'<code>{escape(match.group("code"))}</code>'
+    if match.lastgroup == 'tag':
+        return _link('tag', match.group('tag').lower(), match.group())
+    if match.lastgroup == 'mention':
+        return _link('mention', match.group('mention'), match.group())
+    url = escape(match.group('url'))
+    return f'<a href="{url}" rel="nofollow noopener">{url}</a>'
+
+
+def render(text):
+    """Переводит текст в HTML: **жирный**, *курсив*, `код`, ссылки,
+    #хэштеги, @упоминания и абзацы.
+
+    Весь пользовательский ввод экранируется, теги добавляет только сам
+    рендерер, поэтому результат можно выводить без |escape.
+    """
+    parts = []
+    position = 0
+    for match in TOKEN.finditer(text):
+        parts.append(_inline(text[position:match.start()]))
+        parts.append(_token(match))
+        position = match.end()
+    parts.append(_inline(text[position:]))
+    return linebreaks(''.join(parts), autoescape=False)
+
+
+def render_cached(text):
+    """render() с кэшем по хэшу текста и версии правил."""
+    digest = blake2b(text.encode(), digest_size=16).hexdigest()
+    key = f'markup:{VERSION}:{digest}'
+    html = cache.get(key)
+    if html is None:
+        html = render(text)
+        cache.set(key, html, timeout=settings.MARKUP_CACHE_TIMEOUT)
+    return html
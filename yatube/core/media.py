@@ -0,0 +1,71 @@
+import re
+
+from django.utils.http import http_date, parse_http_date_safe
+
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def file_etag(stat):
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def parse_range(header, size):
+    """Один диапазон из заголовка Range: (начало, конец включительно).
+
+    None — заголовка нет или он не поддерживается (несколько диапазонов),
+    тогда отдаётся весь файл. ValueError — диапазон за пределами файла.
+    """
+    match = RANGE.match(header.replace(' ', '')) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start > end or start >= size:
+        raise ValueError('Диапазон за пределами файла')
+    return start, end
+
+
+def if_range_matches(header, etag, mtime):
+    """If-Range: диапазон отдаётся, только если файл не менялся."""
+    if not header:
+        return True
+    if header.startswith(('"', 'W/')):
+        return header == etag
+    since = parse_http_date_safe(header)
+    return since is not None and int(mtime) <= since
+
+
+class RangeFile:
+    """Файл, из которого читается не больше length байт с позиции start.
+
+    Без fileno(), поэтому сервер не попытается отдать через sendfile
+    весь файл до конца.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def validators(stat):
+    return {
+        'ETag': file_etag(stat),
+        'Last-Modified': http_date(stat.st_mtime),
+    }
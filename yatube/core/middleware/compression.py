@@ -0,0 +1,78 @@
+import re
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from .static import accepts_encoding
+
+STRONG_ETAG = re.compile(r'^"')
+
+
+def gzip_stream(chunks, level):
+    """Сжимает поток по частям, не собирая его в памяти.
+
+    После каждой части делается Z_SYNC_FLUSH, чтобы клиент получал
+    начало страницы, не дожидаясь конца потока.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        data += compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def gzip_bytes(content, level):
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return compressor.compress(content) + compressor.flush()
+
+
+class CompressionMiddleware:
+    """Сжимает текстовые ответы gzip, включая потоковые.
+
+    Сжимаются только типы из COMPRESS_CONTENT_TYPES: картинки и архивы
+    уже сжаты, повторное сжатие тратит процессор впустую. Обычные ответы
+    короче COMPRESS_MIN_SIZE отдаются как есть — заголовки gzip съедят
+    выигрыш.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self.should_compress(request, response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        level = settings.COMPRESS_LEVEL
+        if response.streaming:
+            response.streaming_content = gzip_stream(
+                response.streaming_content, level
+            )
+            del response['Content-Length']
+        else:
+            compressed = gzip_bytes(response.content, level)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+        if response.has_header('ETag'):
+            response['ETag'] = STRONG_ETAG.sub('W/"', response['ETag'])
+        response['Content-Encoding'] = 'gzip'
+        return response
+
+    def should_compress(self, request, response):
+        if response.status_code != 200 or response.has_header(
+            'Content-Encoding'
+        ):
+            return False
+        content_type = response.get('Content-Type', '').split(';')[0]
+        if content_type.strip() not in settings.COMPRESS_CONTENT_TYPES:
+            return False
+        if not response.streaming and (
+            len(response.content) < settings.COMPRESS_MIN_SIZE
+        ):
+            return False
+        return accepts_encoding(request, 'gzip')
@@ -0,0 +1,112 @@
+import hashlib
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.dispatch import Signal
+from django.urls import Resolver404, resolve
+from django.utils.cache import patch_vary_headers
+
+# Страница отдана из кэша без вызова view: обработчики, которым нужен
+# сам факт запроса (например, счётчик просмотров), подписываются сюда.
+page_cache_hit = Signal(
+    providing_args=['request', 'view_name', 'view_kwargs']
+)
+
+
+def _digest(value):
+    return hashlib.md5(value.encode()).hexdigest()
+
+
+def generation_key(path):
+    return f'page_gen:{_digest(path)}'
+
+
+def page_key(full_path):
+    return f'page:{_digest(full_path)}'
+
+
+def purge_pages(*paths):
+    """Сбрасывает закэшированные страницы по путям вместе с ?page= и т.п.
+
+    Новое поколение пути делает все его записи недействительными,
+    перебирать варианты строки запроса не нужно.
+    """
+    cache.set_many(
+        {generation_key(path): uuid.uuid4().hex for path in paths}, None
+    )
+
+
+class PageCacheMiddleware:
+    """Кэш готовых страниц для анонимных посетителей.
+
+    Кэшируются только GET-ответы view из PAGE_CACHE_VIEWS по пути
+    и строке запроса. Запросы с куками из PAGE_CACHE_BYPASS_COOKIES
+    (сессия, сообщения) идут мимо кэша. Запись хранит поколение своего
+    пути и действительна, пока purge_pages не сменит его.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        match = self.cached_view(request)
+        if match is None:
+            return self.get_response(request)
+        gen_key = generation_key(request.path)
+        entry_key = page_key(request.get_full_path())
+        values = cache.get_many([gen_key, entry_key])
+        generation = values.get(gen_key)
+        entry = values.get(entry_key)
+        if entry is not None and entry[0] == generation:
+            response = entry[1]
+            page_cache_hit.send(
+                sender=self.__class__,
+                request=request,
+                view_name=match.view_name,
+                view_kwargs=match.kwargs,
+            )
+            response['X-Page-Cache'] = 'hit'
+            return response
+        if generation is None:
+            # Поколение заводится до вызова view: сброс во время рендера
+            # сменит его, и устаревшая страница не будет отдана.
+            cache.add(gen_key, uuid.uuid4().hex, None)
+            generation = cache.get(gen_key)
+        response = self.get_response(request)
+        patch_vary_headers(response, ('Cookie',))
+        if request.method == 'GET' and self.is_storable(response):
+            cache.set(
+                entry_key,
+                (generation, response),
+                settings.PAGE_CACHE_SECONDS,
+            )
+            response['X-Page-Cache'] = 'miss'
+        return response
+
+    def cached_view(self, request):
+        """Совпадение URL, если ответ можно взять из кэша, иначе None."""
+        if not (
+            settings.PAGE_CACHE_ENABLED
+            and request.method in ('GET', 'HEAD')
+            and not any(
+                name in request.COOKIES
+                for name in settings.PAGE_CACHE_BYPASS_COOKIES
+            )
+        ):
+            return None
+        try:
+            match = resolve(request.path_info)
+        except Resolver404:
+            return None
+        if match.view_name not in settings.PAGE_CACHE_VIEWS:
+            return None
+        return match
+
+    def is_storable(self, response):
+        return (
+            response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+            and 'private' not in response.get('Cache-Control', '')
+        )
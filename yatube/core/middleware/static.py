@@ -0,0 +1,82 @@
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.[^/.]+$')
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+def accepts_encoding(request, coding):
+    """Разрешает ли Accept-Encoding клиента кодировку coding."""
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        name, _, params = part.partition(';')
+        if name.strip().lower() == coding:
+            try:
+                return float(params.partition('q=')[2] or 1) > 0
+            except ValueError:
+                return False
+    return False
+
+
+class StaticFilesMiddleware:
+    """Отдаёт собранную статику из STATIC_ROOT до остальных middleware.
+
+    Файлы с хэшем в имени кэшируются браузером навсегда; если клиент
+    принимает gzip и рядом лежит .gz, отдаётся сжатый вариант.
+    Запросы к отсутствующим файлам проходят дальше по цепочке.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+
+    def __call__(self, request):
+        if (
+            settings.STATIC_ROOT
+            and request.method in ('GET', 'HEAD')
+            and request.path_info.startswith(self.prefix)
+        ):
+            name = request.path_info[len(self.prefix):]
+            response = self.serve(request, name)
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+    def serve(self, request, name):
+        try:
+            path = safe_join(settings.STATIC_ROOT, name)
+        except ValueError:
+            return None
+        if not os.path.isfile(path):
+            return None
+        stat = os.stat(path)
+        if not was_modified_since(
+            request.META.get('HTTP_IF_MODIFIED_SINCE'),
+            stat.st_mtime,
+            stat.st_size,
+        ):
+            return HttpResponseNotModified()
+        content_type = mimetypes.guess_type(path)[0]
+        encoding = None
+        if accepts_encoding(request, 'gzip') and os.path.isfile(f'{path}.gz'):
+            path, encoding = f'{path}.gz', 'gzip'
+        response = FileResponse(
+            open(path, 'rb'),
+            content_type=content_type or 'application/octet-stream',
+            filename=os.path.basename(name),
+        )
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        response['Vary'] = 'Accept-Encoding'
+        if encoding:
+            response['Content-Encoding'] = encoding
+        response['Cache-Control'] = (
+            IMMUTABLE if HASHED_NAME.search(name)
+            else f'public, max-age={settings.STATIC_MAX_AGE}'
+        )
+        return response
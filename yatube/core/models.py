@@ -1,4 +1,7 @@
 from django.db import models
+from django.utils.safestring import mark_safe
+
+from .markup import render_cached
 
 
 class CreatedModel(models.Model):
@@ -10,3 +13,16 @@ class CreatedModel(models.Model):
 
     class Meta:
         abstract = True
+
+
+class RenderedTextModel(models.Model):
+    """Абстрактная модель. Хранит текст, заранее переведённый в HTML."""
+    text_html = models.TextField(editable=False, blank=True)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def rendered_text(self):
+        """HTML текста; для ещё не отрендеренных записей — из кэша."""
+        return mark_safe(self.text_html or render_cached(self.text))
@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+COUNT_KEY = 'count:{}'
+
+
+def invalidate_counts(*scopes):
+    cache.delete_many([COUNT_KEY.format(scope) for scope in scopes])
+
+
+class CachedCountPaginator(Paginator):
+    """Paginator с числом записей из кэша и окном номеров страниц.
+
+    scope — имя выборки («index», «group:5»), по которому кэшируется
+    COUNT(*); записи сбрасывают его через invalidate_counts. estimate —
+    функция, дающая примерное число без COUNT(*) (например, из
+    счётчиков). При промахе кэша большие выборки, от
+    PAGINATOR_ESTIMATE_THRESHOLD записей, считаются по ней, маленькие —
+    точно.
+
+    Срез страницы не обрезается по count, поэтому неточное число
+    влияет только на навигацию, а не на показанные записи.
+    """
+
+    def __init__(self, object_list, per_page, scope=None, estimate=None,
+                 **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.scope = scope
+        self.estimate = estimate
+
+    @cached_property
+    def count(self):
+        if self.scope is None:
+            return super().count
+        key = COUNT_KEY.format(self.scope)
+        count = cache.get(key)
+        if count is None:
+            count = self.estimate() if self.estimate else None
+            if count is None or count < settings.PAGINATOR_ESTIMATE_THRESHOLD:
+                count = super().count
+            cache.set(key, count, settings.PAGINATOR_COUNT_TIMEOUT)
+        return count
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        page = self._get_page(
+            self.object_list[bottom:bottom + self.per_page], number, self
+        )
+        page.page_window = self.page_window(number)
+        return page
+
+    def page_window(self, number):
+        """Номера страниц вокруг текущей, не больше 2 * WINDOW + 1."""
+        size = settings.PAGINATOR_WINDOW
+        return range(
+            max(number - size, 1), min(number + size, self.num_pages) + 1
+        )
@@ -0,0 +1,88 @@
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.cache import cache
+from django.http import HttpResponse
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+
+def parse_rate(rate):
+    """'10/m' -> (10, 60)."""
+    count, period = rate.split('/')
+    return int(count), PERIODS[period]
+
+
+def acquire(key, rate):
+    """Алгоритм GCRA поверх атомарного cache.incr.
+
+    В кэше хранится теоретическое время прихода следующего запроса (TAT)
+    в миллисекундах. Каждый запрос сдвигает его на интервал T, запрос
+    проходит, если TAT опережает текущее время не больше чем на count * T.
+    Возвращает 0, если запрос разрешён, иначе секунды до повтора.
+    """
+    count, period = parse_rate(rate)
+    interval = period * 1000 // count
+    now = int(time.time() * 1000)
+    cache.add(key, now, timeout=period * 2)
+    try:
+        tat = cache.incr(key, interval)
+    except ValueError:
+        cache.set(key, now + interval, timeout=period * 2)
+        return 0
+    if tat - interval < now:
+        tat = now + interval
+        cache.set(key, tat, timeout=period * 2)
+    else:
+        # incr не продлевает срок ключа, а TAT может уйти дальше него:
+        # ключ должен жить, пока TAT не отстанет от времени на период.
+        cache.touch(key, (tat - now) // 1000 + period)
+    overshoot = tat - now - count * interval
+    if overshoot > 0:
+        cache.decr(key, interval)
+        return overshoot // 1000 + 1
+    return 0
+
+
+def client_keys(request):
+    """Ключи клиента: IP и id пользователя из сессии.
+
+    id берётся из уже загруженной сессии без чтения пользователя, поэтому
+    все сессии одного аккаунта делят лимит, а выдуманная cookie сессии
+    нового лимита не даёт.
+    """
+    yield 'ip', request.META.get('REMOTE_ADDR', '')
+    user_id = request.session.get(SESSION_KEY)
+    if user_id:
+        yield 'user', user_id
+
+
+def ratelimit(group):
+    """Декоратор view: лимиты группы group из settings.RATELIMITS.
+
+    Ставится над login_required, чтобы лишние запросы отсекались
+    до загрузки пользователя. Счётчики живут в кэше, поэтому лимит
+    общий для всех процессов, только если кэш общий (memcached,
+    Redis): с LocMemCache у каждого процесса свой счётчик.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not settings.RATELIMIT_ENABLED:
+                return view(request, *args, **kwargs)
+            limits = settings.RATELIMITS[group]
+            for scope, value in client_keys(request):
+                retry_after = acquire(
+                    f'ratelimit:{group}:{scope}:{value}', limits[scope]
+                )
+                if retry_after:
+                    response = HttpResponse(
+                        'Слишком много запросов', status=429
+                    )
+                    response['Retry-After'] = str(retry_after)
+                    return response
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,100 @@
+import random
+import threading
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+
+_state = threading.local()
+
+
+def _pin_key(user):
+    return f'replica_pin:{user.pk}'
+
+
+def is_pinned(user):
+    """Пользователь недавно писал и должен читать с основной базы."""
+    return user.is_authenticated and bool(cache.get(_pin_key(user)))
+
+
+def pin_user(user):
+    cache.set(_pin_key(user), True, settings.REPLICA_PIN_SECONDS)
+
+
+@contextmanager
+def replica_reads():
+    """Включает чтение с реплик для кода внутри блока."""
+    previous = getattr(_state, 'use_replica', False)
+    _state.use_replica = True
+    try:
+        yield
+    finally:
+        _state.use_replica = previous
+
+
+@contextmanager
+def primary_reads():
+    """Чтение с основной базы внутри блока, даже во view на реплике."""
+    previous = getattr(_state, 'use_replica', False)
+    _state.use_replica = False
+    try:
+        yield
+    finally:
+        _state.use_replica = previous
+
+
+def read_from_replica(view):
+    """Декоратор view: запросы на чтение уходят на реплику.
+
+    Пользователь, недавно создавший пост или комментарий, продолжает
+    читать с основной базы, чтобы сразу увидеть свои изменения.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not settings.DATABASE_REPLICAS or is_pinned(request.user):
+            return view(request, *args, **kwargs)
+        with replica_reads():
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+def pin_to_primary(view):
+    """Декоратор пишущего view: закрепляет пользователя за основной базой.
+
+    Закрепляет после любого успешного ответа, а не только на POST:
+    подписка и отписка — обычные ссылки.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if response.status_code < 400 and request.user.is_authenticated:
+            pin_user(request.user)
+        return response
+    return wrapper
+
+
+class ReplicaRouter:
+    """Чтение ленты с реплик, запись — в основную базу."""
+
+    def db_for_read(self, model, **hints):
+        if not getattr(_state, 'use_replica', False):
+            return None
+        if model._meta.app_label not in settings.REPLICA_APP_LABELS:
+            return None
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        replicas = settings.DATABASE_REPLICAS
+        return random.choice(replicas) if replicas else None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -0,0 +1,116 @@
+import re
+import threading
+from collections import Counter, deque
+from hashlib import blake2b
+
+BITS = 64
+LANE = 32
+WORD = re.compile(r'\w+')
+SPREAD = [
+    sum((byte >> bit & 1) << bit * LANE for bit in range(8))
+    for byte in range(256)
+]
+
+
+def words(text):
+    return WORD.findall(text.lower())
+
+
+def _hash(feature):
+    return int.from_bytes(
+        blake2b(feature.encode(), digest_size=8).digest(), 'big'
+    )
+
+
+def _spread(value):
+    """Раскладывает биты числа по 32-битным ячейкам.
+
+    Сумма разложенных хэшей, умноженных на веса, хранит в ячейке i
+    суммарный вес признаков с единицей в бите i — без цикла по 64 битам.
+    """
+    return sum(
+        SPREAD[value >> shift & 0xFF] << shift * LANE
+        for shift in range(0, BITS, 8)
+    )
+
+
+def simhash(text):
+    """64-битный SimHash по словам и парам соседних слов.
+
+    Похожие тексты дают отпечатки, отличающиеся в нескольких битах.
+    """
+    tokens = words(text)
+    features = Counter(tokens)
+    features.update(' '.join(pair) for pair in zip(tokens, tokens[1:]))
+    columns = sum(
+        _spread(_hash(feature)) * weight
+        for feature, weight in features.items()
+    )
+    half = sum(features.values()) / 2
+    lane = (1 << LANE) - 1
+    return sum(
+        1 << bit for bit in range(BITS)
+        if (columns >> bit * LANE & lane) > half
+    )
+
+
+def distance(first, second):
+    return bin(first ^ second).count('1')
+
+
+class SimHashIndex:
+    """Индекс последних отпечатков с поиском по полосам.
+
+    Отпечаток делится на bands полос. Если отпечатки отличаются не больше
+    чем в max_distance битах и max_distance < bands, хотя бы одна полоса
+    совпадает целиком, поэтому сравниваются только кандидаты из тех же
+    корзин, а не весь индекс.
+    """
+
+    def __init__(self, capacity, max_distance=3, bands=4):
+        self.capacity = capacity
+        self.max_distance = max_distance
+        self.band_bits = BITS // bands
+        self.mask = (1 << self.band_bits) - 1
+        self.buckets = [{} for _ in range(bands)]
+        self.order = deque()
+        self.lock = threading.Lock()
+
+    def _bands(self, fingerprint):
+        for index in range(len(self.buckets)):
+            yield index, fingerprint >> (index * self.band_bits) & self.mask
+
+    def add(self, fingerprint):
+        with self.lock:
+            self.order.append(fingerprint)
+            for index, band in self._bands(fingerprint):
+                bucket = self.buckets[index].setdefault(band, Counter())
+                bucket[fingerprint] += 1
+            if len(self.order) > self.capacity:
+                self._evict(self.order.popleft())
+
+    def _evict(self, fingerprint):
+        for index, band in self._bands(fingerprint):
+            bucket = self.buckets[index][band]
+            bucket[fingerprint] -= 1
+            if not bucket[fingerprint]:
+                del bucket[fingerprint]
+            if not bucket:
+                del self.buckets[index][band]
+
+    def contains_near(self, fingerprint):
+        with self.lock:
+            for index, band in self._bands(fingerprint):
+                for candidate in self.buckets[index].get(band, ()):
+                    if distance(candidate, fingerprint) <= self.max_distance:
+                        return True
+        return False
+
+    def clear(self):
+        with self.lock:
+            self.order.clear()
+            for bucket in self.buckets:
+                bucket.clear()
+
+    def __len__(self):
+        return len(self.order)
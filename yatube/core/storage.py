@@ -0,0 +1,101 @@
+import gzip
+import hashlib
+import os
+import posixpath
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile, File
+from django.core.files.storage import FileSystemStorage
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хэшем содержимого в имени и готовыми .gz рядом.
+
+    Сжатие делается один раз при collectstatic, поэтому сервер только
+    выбирает подходящий файл. Сжатый вариант пишется, только если он
+    заметно меньше исходного.
+    """
+    manifest_strict = False
+
+    def stored_name(self, name):
+        """Имя с хэшем; без манифеста и файла — исходное имя.
+
+        Позволяет рендерить шаблоны до первого collectstatic.
+        """
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        hashed_names = set()
+        for name, hashed_name, processed in super().post_process(
+            paths, dry_run, **options
+        ):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed_names.add(hashed_name)
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for hashed_name in sorted(hashed_names):
+            compressed = self.compress(hashed_name)
+            if compressed:
+                yield hashed_name, compressed, True
+
+    def compress(self, name):
+        """Пишет name.gz и возвращает его имя либо None."""
+        extension = os.path.splitext(name)[1].lower()
+        if extension not in settings.STATIC_COMPRESS_EXTENSIONS:
+            return None
+        with self.open(name) as original:
+            content = original.read()
+        packed = gzip.compress(content, compresslevel=9, mtime=0)
+        if len(packed) > len(content) * settings.STATIC_COMPRESS_MAX_RATIO:
+            return None
+        compressed_name = f'{name}.gz'
+        if self.exists(compressed_name):
+            self.delete(compressed_name)
+        self._save(compressed_name, ContentFile(packed))
+        return compressed_name
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Файлы с именем по SHA-256 содержимого: posts/ab/cd/<хэш>.jpg.
+
+    Одинаковые загрузки сохраняются один раз, записи ссылаются на общий
+    файл. Два уровня каталогов держат их небольшими. Файл не удаляется
+    вместе с записью: на него могут ссылаться другие записи, файлы без
+    ссылок удаляет команда gc_media. Повторная загрузка обновляет время
+    изменения файла, чтобы gc_media не удалил его, пока запись
+    со ссылкой ещё не сохранена.
+    """
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, content)
+        try:
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            pass
+        else:
+            return name
+        return super().save(name, content, max_length=max_length)
+
+    def hashed_name(self, name, content):
+        digest = hashlib.sha256()
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        for chunk in content.chunks():
+            digest.update(chunk)
+        if hasattr(content, 'seek'):
+            content.seek(0)
+        hexdigest = digest.hexdigest()
+        directory = posixpath.dirname(name.replace('\\', '/'))
+        extension = os.path.splitext(name)[1].lower()
+        return posixpath.join(
+            directory, hexdigest[:2], hexdigest[2:4], hexdigest + extension
+        )
@@ -0,0 +1,43 @@
+import gzip
+
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase
+
+from ..middleware.compression import CompressionMiddleware
+
+PAGE = b'<p>' + b'yatube ' * 500 + b'</p>'
+
+
+class CompressionMiddlewareTest(SimpleTestCase):
+    def respond(self, response, encoding='gzip, deflate'):
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING=encoding)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_html_compressed(self):
+        response = self.respond(HttpResponse(PAGE))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(gzip.decompress(response.content), PAGE)
+
+    def test_streaming_compressed(self):
+        response = self.respond(
+            StreamingHttpResponse(PAGE[i:i + 100] for i in range(0, 3503, 100))
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(
+            gzip.decompress(b''.join(response.streaming_content)), PAGE
+        )
+
+    def test_skipped_responses(self):
+        """Маленькие, нетекстовые и ответы без gzip у клиента не сжимаются."""
+        cases = {
+            'маленький': (HttpResponse(b'<p>ok</p>'), 'gzip'),
+            'картинка': (
+                HttpResponse(PAGE, content_type='image/png'), 'gzip'
+            ),
+            'без gzip': (HttpResponse(PAGE), 'br'),
+        }
+        for name, (response, encoding) in cases.items():
+            with self.subTest(name=name):
+                response = self.respond(response, encoding)
+                self.assertFalse(response.has_header('Content-Encoding'))
@@ -0,0 +1,44 @@
+import threading
+
+from django.test import SimpleTestCase
+
+from ..counters import BufferedCounter, RingCounter
+
+
+class CountersTest(SimpleTestCase):
+    def test_buffered_counter_drains(self):
+        counter = BufferedCounter(flush_interval=60)
+        counter.add('a')
+        counter.add('a', 2)
+        self.assertEqual(counter.pending('a'), 3)
+        self.assertEqual(counter.drain(), {'a': 3})
+        self.assertEqual(counter.drain(), {})
+
+    def test_ring_counter_groups_by_bucket(self):
+        """События попадают в корзину своего интервала."""
+        counter = RingCounter(size=2, width=10, flush_interval=60)
+        counter.add('a', now=100)
+        counter.add('a', now=105)
+        counter.add('a', now=111)
+        self.assertEqual(counter.drain(), {(10, 'a'): 2, (11, 'a'): 1})
+
+    def test_ring_counter_keeps_evicted_slot(self):
+        """Вытесненная несброшенная корзина попадает в следующий drain."""
+        counter = RingCounter(size=2, width=10, flush_interval=60)
+        counter.add('a', now=100)
+        counter.add('a', now=120)
+        self.assertEqual(counter.pending('a'), 2)
+        self.assertEqual(counter.drain(), {(10, 'a'): 1, (12, 'a'): 1})
+        self.assertEqual(counter.drain(), {})
+
+    def test_schedule_starts_one_timer(self):
+        """Пока таймер ждёт, повторный schedule новый не заводит."""
+        counter = BufferedCounter(flush_interval=0.01)
+        fired = threading.Event()
+        counter.schedule(fired.set)
+        timer = counter.timer
+        counter.schedule(fired.set)
+        self.assertIs(counter.timer, timer)
+        self.assertTrue(fired.wait(1))
+        timer.join(1)
+        self.assertIsNone(counter.timer)
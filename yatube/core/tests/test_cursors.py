@@ -0,0 +1,18 @@
+from datetime import datetime, timezone
+
+from django.test import SimpleTestCase
+
+from ..cursors import decode_cursor, encode_cursor
+
+
+class CursorsTest(SimpleTestCase):
+    def test_round_trip_keeps_microseconds(self):
+        moment = datetime(2022, 5, 1, 12, 30, 15, 123456, tzinfo=timezone.utc)
+        self.assertEqual(
+            decode_cursor(encode_cursor(moment, 42)), (moment, 42)
+        )
+
+    def test_broken_cursor_is_ignored(self):
+        for value in (None, '', 'abc', '1_2_3', '99999999999999999999_1'):
+            with self.subTest(value=value):
+                self.assertIsNone(decode_cursor(value))
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase
+
+
+class SQLitePragmasTest(TestCase):
+    def test_connection_uses_configured_pragmas(self):
+        """Соединение с SQLite получает настройки из SQLITE_PRAGMAS."""
+        with connection.cursor() as cursor:
+            for name in ('busy_timeout', 'synchronous', 'cache_size'):
+                with self.subTest(pragma=name):
+                    cursor.execute(f'PRAGMA {name}')
+                    value = cursor.fetchone()[0]
+                    expected = settings.SQLITE_PRAGMAS[name]
+                    if name == 'synchronous':
+                        expected = 1
+                    self.assertEqual(value, expected)
@@ -0,0 +1,153 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import Http404
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from ..bloom import BloomFilter
+from ..entities import (
+    ExistenceFilter, LocalLRU, entity_key, filters,
+    get_cached_object, get_cached_object_or_404, local, may_exist
+)
+from ..routers import replica_reads
+
+User = get_user_model()
+
+
+class LocalLRUTest(SimpleTestCase):
+    def test_evicts_least_recent(self):
+        lru = LocalLRU(2, 60)
+        lru.set('a', b'1')
+        lru.set('b', b'2')
+        lru.get('a')
+        lru.set('c', b'3')
+        self.assertIsNone(lru.get('b'))
+        self.assertEqual(lru.get('a'), b'1')
+
+    def test_entries_expire(self):
+        lru = LocalLRU(2, 5)
+        with mock.patch('core.entities.time.monotonic', return_value=100):
+            lru.set('a', b'1')
+        with mock.patch('core.entities.time.monotonic', return_value=106):
+            self.assertIsNone(lru.get('a'))
+
+
+class BloomFilterTest(SimpleTestCase):
+    def test_no_false_negatives(self):
+        bloom = BloomFilter(1000, 0.01)
+        for i in range(1000):
+            bloom.add(f'user{i}')
+        self.assertTrue(all(f'user{i}' in bloom for i in range(1000)))
+        false_positives = sum(f'other{i}' in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class EntityCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        local.clear()
+        filters.clear()
+        self.user = User.objects.create_user(
+            username='author', email='author@example.com', password='secret'
+        )
+
+    def test_lookup_cached(self):
+        get_cached_object_or_404(User, username='author')
+        with self.assertNumQueries(0):
+            user = get_cached_object_or_404(User, username='author')
+        self.assertEqual(user, self.user)
+        local.clear()
+        with self.assertNumQueries(0):
+            get_cached_object_or_404(User, username='author')
+
+    def test_missing_object(self):
+        with self.assertRaises(Http404):
+            get_cached_object_or_404(User, username='nobody')
+
+    def test_save_and_rename_invalidate(self):
+        get_cached_object_or_404(User, username='author')
+        self.user.first_name = 'Лев'
+        self.user.save()
+        self.assertEqual(
+            get_cached_object_or_404(User, username='author').first_name,
+            'Лев',
+        )
+        self.user.username = 'writer'
+        self.user.save()
+        with self.assertRaises(Http404):
+            get_cached_object_or_404(User, username='author')
+        get_cached_object_or_404(User, username='writer')
+        self.user.delete()
+        with self.assertRaises(Http404):
+            get_cached_object_or_404(User, username='writer')
+
+    def test_missing_lookup_cached(self):
+        """Отсутствие кэшируется и сбрасывается при создании объекта."""
+        with self.settings(ENTITY_BLOOM_FIELDS={}):
+            self.assertIsNone(get_cached_object(User, username='newbie'))
+            with self.assertNumQueries(0):
+                get_cached_object(User, username='newbie')
+            User.objects.create_user(username='newbie')
+            self.assertIsNotNone(get_cached_object(User, username='newbie'))
+
+    @mock.patch('core.entities.cache_is_shared', return_value=True)
+    def test_bloom_rejects_unknown_values(self, shared):
+        get_cached_object(User, username='author')
+        local.clear()
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_cached_object(User, username='crawler'))
+        User.objects.create_user(username='crawler')
+        self.assertIsNotNone(get_cached_object(User, username='crawler'))
+
+    @override_settings(DATABASE_REPLICAS=['replica'])
+    def test_fill_reads_primary(self):
+        """Промах внутри view на реплике читает основную базу."""
+        with replica_reads():
+            user = get_cached_object(User, username='author')
+        self.assertEqual(user, self.user)
+
+    def test_user_cached_without_secrets(self):
+        get_cached_object(User, username='author')
+        data = cache.get(entity_key(User, 'username', 'author'))
+        self.assertNotIn(self.user.password.encode(), data)
+        self.assertNotIn(b'author@example.com', data)
+        self.assertEqual(
+            get_cached_object(User, username='author').username, 'author'
+        )
+
+    def test_local_cache_ignores_filter(self):
+        """С кэшем процесса фильтр не отвечает «нет»: его не сбросить."""
+        bloom = filters['auth.user'] = ExistenceFilter(User, 'username')
+        # Пользователь появился в другом процессе: поколение в этом
+        # кэше и фильтр процесса о нём не знают.
+        User.objects.create_user(username='elsewhere')
+        cache.set(bloom.key, bloom.generation, None)
+        bloom.filter = BloomFilter(1)
+        self.assertTrue(
+            may_exist(User.objects.all(), 'username', 'elsewhere')
+        )
+
+    @mock.patch('core.entities.cache_is_shared', return_value=True)
+    def test_filter_changed_during_load_is_stale(self, shared):
+        """Объект, созданный во время загрузки фильтра, не получает 404."""
+        class RacingFilter(ExistenceFilter):
+            def load(self, queryset, field):
+                bloom = super().load(queryset, field)
+                User.objects.create_user(username='racer')
+                return bloom
+
+        bloom = RacingFilter(User, 'username')
+        self.assertFalse(bloom.is_current())
+        filters['auth.user'] = bloom
+        self.assertTrue(may_exist(User.objects.all(), 'username', 'racer'))
+
+    @mock.patch('core.entities.cache_is_shared', return_value=True)
+    def test_concurrent_rebuild_falls_through(self, shared):
+        """Пока фильтр строит другой поток, запрос идёт обычным путём."""
+        with mock.patch('core.entities.rebuild_lock') as lock:
+            lock.acquire.return_value = False
+            self.assertTrue(
+                may_exist(User.objects.all(), 'username', 'nobody')
+            )
+        self.assertNotIn('auth.user', filters)
@@ -0,0 +1,40 @@
+from django.test import SimpleTestCase
+
+from ..markup import hashtags, mentions, render
+
+
+class MarkupTest(SimpleTestCase):
+    def test_escapes_html(self):
+        self.assertEqual(
+            render('<script>alert(1)</script>'),
+            '<p>&lt;script&gt;alert(1)&lt;/script&gt;</p>',
+        )
+
+    def test_inline_formatting(self):
+        self.assertEqual(
+            render('**жирный**, *курсив* и `a*b*`'),
+            '<p><strong>жирный</strong>, <em>курсив</em> '
+            'и <code>a*b*</code></p>',
+        )
+
+    def test_autolink_keeps_url_intact(self):
+        """Подчёркивания в ссылке не превращаются в курсив."""
+        html = render('см. https://example.com/a_b_c.')
+        self.assertIn(
+            '<a href="https://example.com/a_b_c" rel="nofollow noopener">',
+            html,
+        )
+        self.assertTrue(html.endswith('</a>.</p>'))
+
+    def test_line_breaks(self):
+        self.assertEqual(
+            render('раз\nдва\n\nтри'),
+            '<p>раз<br>два</p>\n\n<p>три</p>',
+        )
+
+    def test_hashtags_and_mentions(self):
+        text = 'Привет, @leo! #Django и #django, https://x.com/#anchor `#code`'
+        self.assertEqual(hashtags(text), {'django'})
+        self.assertEqual(mentions(text), {'leo'})
+        self.assertIn('<a href="/tags/django/">#Django</a>', render(text))
+        self.assertIn('<a href="/profile/leo/">@leo</a>', render(text))
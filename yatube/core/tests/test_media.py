@@ -0,0 +1,75 @@
+import os
+import shutil
+import tempfile
+
+from django.test import TestCase, override_settings
+
+MEDIA_ROOT = tempfile.mkdtemp()
+CONTENT = bytes(range(256)) * 4
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class MediaViewTest(TestCase):
+    url = '/media/posts/pic.jpg'
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(MEDIA_ROOT, 'posts'))
+        with open(os.path.join(MEDIA_ROOT, 'posts', 'pic.jpg'), 'wb') as file:
+            file.write(CONTENT)
+        with open(os.path.join(MEDIA_ROOT, 'secret.txt'), 'wb') as file:
+            file.write(b'secret')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def body(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_full_file_with_validators(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(self.body(response), CONTENT)
+        repeat = self.client.get(
+            self.url, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(repeat.status_code, 304)
+
+    def test_byte_ranges(self):
+        cases = (
+            ('bytes=10-19', 'bytes 10-19/1024', CONTENT[10:20]),
+            ('bytes=1000-', 'bytes 1000-1023/1024', CONTENT[1000:]),
+            ('bytes=-4', 'bytes 1020-1023/1024', CONTENT[-4:]),
+        )
+        for header, content_range, content in cases:
+            with self.subTest(header=header):
+                response = self.client.get(self.url, HTTP_RANGE=header)
+                self.assertEqual(response.status_code, 206)
+                self.assertEqual(response['Content-Range'], content_range)
+                self.assertEqual(self.body(response), content)
+
+    def test_unsatisfiable_and_stale_ranges(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=2000-')
+        self.assertEqual(response.status_code, 416)
+        response = self.client.get(
+            self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"old"'
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_only_upload_dirs_served(self):
+        for url in ('/media/secret.txt', '/media/posts/../secret.txt'):
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 404)
+
+    @override_settings(MEDIA_SENDFILE_HEADER='X-Accel-Redirect')
+    def test_accel_redirect(self):
+        response = self.client.get(self.url)
+        self.assertEqual(
+            response['X-Accel-Redirect'], '/protected-media/posts/pic.jpg'
+        )
+        self.assertEqual(response.content, b'')
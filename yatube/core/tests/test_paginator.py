@@ -0,0 +1,59 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+
+from ..paginator import CachedCountPaginator, invalidate_counts
+
+
+class CountingList(list):
+    """Список, считающий вызовы count() — как COUNT(*) у QuerySet."""
+    counted = 0
+
+    def count(self):
+        self.counted += 1
+        return len(self)
+
+
+class CachedCountPaginatorTest(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_count_cached_per_scope(self):
+        items = CountingList(range(25))
+        for _ in range(2):
+            CachedCountPaginator(items, 10, scope='test').count
+        self.assertEqual(items.counted, 1)
+        invalidate_counts('test')
+        self.assertEqual(
+            CachedCountPaginator(items, 10, scope='test').num_pages, 3
+        )
+        self.assertEqual(items.counted, 2)
+
+    @override_settings(PAGINATOR_ESTIMATE_THRESHOLD=20)
+    def test_estimate_used_for_large_scopes(self):
+        items = CountingList(range(25))
+        paginator = CachedCountPaginator(
+            items, 10, scope='big', estimate=lambda: 30
+        )
+        self.assertEqual(paginator.count, 30)
+        self.assertEqual(items.counted, 0)
+        small = CachedCountPaginator(
+            items, 10, scope='small', estimate=lambda: 5
+        )
+        self.assertEqual(small.count, 25)
+
+    def test_stale_count_does_not_truncate_page(self):
+        """Заниженное число влияет только на навигацию."""
+        cache.set('count:stale', 3)
+        page = CachedCountPaginator(range(25), 10, scope='stale').page(1)
+        self.assertEqual(len(page), 10)
+
+    @override_settings(PAGINATOR_WINDOW=2)
+    def test_page_window_bounded(self):
+        paginator = CachedCountPaginator(range(10000), 10)
+        self.assertEqual(list(paginator.page(1).page_window), [1, 2, 3])
+        self.assertEqual(
+            list(paginator.page(500).page_window), [498, 499, 500, 501, 502]
+        )
+        self.assertEqual(
+            list(paginator.page(1000).page_window), [998, 999, 1000]
+        )
@@ -0,0 +1,72 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+from ..ratelimit import acquire
+
+
+class RateLimitTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='Spammer')
+        cls.post = Post.objects.create(author=cls.user, text='Пост')
+
+    def setUp(self):
+        cache.clear()
+
+    def test_gcra_allows_burst_then_limits(self):
+        """Проходит не больше count запросов подряд."""
+        results = [acquire('test', '3/m') for _ in range(4)]
+        self.assertEqual(results[:3], [0, 0, 0])
+        self.assertGreater(results[3], 0)
+
+    def test_key_outlives_first_ttl(self):
+        """Ключ при постоянной нагрузке живёт дольше срока из cache.add."""
+        start = 1_000_000
+
+        def at(seconds, requests=1):
+            with mock.patch('time.time', return_value=start + seconds):
+                return [acquire('test', '3/m') for _ in range(requests)]
+
+        self.assertEqual(at(0, 3), [0, 0, 0])
+        for seconds in (40, 60, 80, 100, 119):
+            self.assertEqual(at(seconds), [0])
+        # Срок ключа из cache.add (два периода) уже истёк, но TAT
+        # впереди: второй запрос подряд должен быть отклонён.
+        results = at(121, 2)
+        self.assertEqual(results[0], 0)
+        self.assertGreater(results[1], 0)
+
+    @override_settings(RATELIMITS={
+        'add_comment': {'user': '2/m', 'ip': '100/m'},
+    })
+    def test_view_returns_429_before_loading_user(self):
+        """Лишний запрос получает 429 до загрузки пользователя и поста."""
+        client = Client()
+        client.force_login(self.user)
+        url = reverse('posts:add_comment', kwargs={'post_id': self.post.pk})
+        for _ in range(2):
+            client.post(url, {'text': 'Ещё комментарий'})
+        # Только чтение сессии: ни пользователя, ни поста.
+        with self.assertNumQueries(1):
+            response = client.post(url, {'text': 'Ещё комментарий'})
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response)
+
+    @override_settings(RATELIMITS={
+        'add_comment': {'user': '2/m', 'ip': '100/m'},
+    })
+    def test_user_limit_shared_between_sessions(self):
+        """Новая сессия того же пользователя не даёт нового лимита."""
+        url = reverse('posts:add_comment', kwargs={'post_id': self.post.pk})
+        first, second = Client(), Client()
+        first.force_login(self.user)
+        second.force_login(self.user)
+        for _ in range(2):
+            first.post(url, {'text': 'Комментарий'})
+        response = second.post(url, {'text': 'Комментарий'})
+        self.assertEqual(response.status_code, 429)
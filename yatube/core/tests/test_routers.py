@@ -0,0 +1,60 @@
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post, User
+from ..routers import (
+    ReplicaRouter, is_pinned, pin_user, read_from_replica, replica_reads
+)
+
+
+@override_settings(DATABASE_REPLICAS=['replica'])
+class ReplicaRouterTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='ReplicaUser')
+        cls.router = ReplicaRouter()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_reads_go_to_primary_by_default(self):
+        """Вне ленты чтение идёт в основную базу."""
+        self.assertIsNone(self.router.db_for_read(Post))
+
+    def test_feed_reads_go_to_replica(self):
+        """Внутри ленты посты читаются с реплики, сессии — нет."""
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(Post), 'replica')
+            self.assertIsNone(self.router.db_for_read(Session))
+
+    def test_writes_go_to_primary(self):
+        with replica_reads():
+            self.assertEqual(self.router.db_for_write(Post), 'default')
+
+    def test_pinned_user_reads_primary(self):
+        """После записи пользователь читает с основной базы."""
+        @read_from_replica
+        def view(request):
+            return self.router.db_for_read(Post)
+
+        request = RequestFactory().get('/')
+        request.user = self.user
+        self.assertEqual(view(request), 'replica')
+        pin_user(self.user)
+        self.assertIsNone(view(request))
+
+    def test_follow_link_pins_user(self):
+        """Подписка по ссылке (GET) тоже закрепляет за основной базой."""
+        author = User.objects.create(username='Followed')
+        self.client.force_login(self.user)
+        self.client.get(
+            reverse('posts:profile_follow', args=(author.username,))
+        )
+        self.assertTrue(is_pinned(self.user))
+
+    def test_no_migrations_on_replica(self):
+        self.assertFalse(self.router.allow_migrate('replica', 'posts'))
+        self.assertIsNone(self.router.allow_migrate('default', 'posts'))
@@ -0,0 +1,35 @@
+from django.test import SimpleTestCase
+
+from ..simhash import SimHashIndex, distance, simhash
+
+SPAM = (
+    'Купите лучшие часы со скидкой прямо сейчас на нашем сайте. '
+    'Доставка по всей стране бесплатно, оплата при получении, гарантия '
+    'два года и подарок каждому покупателю. Звоните нам в любое время, '
+    'наши менеджеры ответят на все вопросы и помогут выбрать модель '
+    'по вкусу и по карману.'
+)
+
+
+class SimHashTest(SimpleTestCase):
+    def test_near_duplicates_have_close_fingerprints(self):
+        """Замена одного слова меняет отпечаток лишь в нескольких битах."""
+        near = simhash(SPAM.replace('два года', 'три года'))
+        self.assertLessEqual(distance(simhash(SPAM), near), 3)
+        index = SimHashIndex(capacity=1)
+        index.add(simhash(SPAM))
+        self.assertTrue(index.contains_near(near))
+        other = simhash('Сегодня гуляли в парке и кормили уток хлебом')
+        self.assertGreater(distance(simhash(SPAM), other), 3)
+
+    def test_index_finds_and_evicts(self):
+        """Индекс находит близкие отпечатки и забывает старые."""
+        index = SimHashIndex(capacity=2)
+        fingerprint = simhash(SPAM)
+        index.add(fingerprint)
+        self.assertTrue(index.contains_near(fingerprint ^ 0b101))
+        self.assertFalse(index.contains_near(fingerprint ^ 0xF0F))
+        index.add(1)
+        index.add(2)
+        self.assertEqual(len(index), 2)
+        self.assertFalse(index.contains_near(fingerprint))
@@ -0,0 +1,57 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+SOURCE_DIR = tempfile.mkdtemp()
+STATIC_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(STATICFILES_DIRS=[SOURCE_DIR], STATIC_ROOT=STATIC_ROOT)
+class StaticPipelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(SOURCE_DIR, 'css'))
+        with open(os.path.join(SOURCE_DIR, 'css', 'site.css'), 'w') as file:
+            file.write('body { margin: 0; }\n' * 100)
+        call_command('collectstatic', interactive=False, stdout=StringIO())
+        cls.hashed = next(
+            name for name in os.listdir(os.path.join(STATIC_ROOT, 'css'))
+            if name.startswith('site.') and name.endswith('.css')
+            and name != 'site.css'
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(SOURCE_DIR, ignore_errors=True)
+        shutil.rmtree(STATIC_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def test_collectstatic_writes_gzip_sibling(self):
+        self.assertTrue(os.path.isfile(
+            os.path.join(STATIC_ROOT, 'css', f'{self.hashed}.gz')
+        ))
+
+    def test_hashed_file_served_compressed_and_immutable(self):
+        response = self.client.get(
+            f'/static/css/{self.hashed}', HTTP_ACCEPT_ENCODING='gzip, br'
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertIn('immutable', response['Cache-Control'])
+
+    def test_plain_file_without_gzip(self):
+        """Без gzip в Accept-Encoding отдаётся исходный файл."""
+        response = self.client.get(
+            '/static/css/site.css', HTTP_ACCEPT_ENCODING='gzip;q=0'
+        )
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertNotIn('immutable', response['Cache-Control'])
+        self.assertEqual(
+            b''.join(response.streaming_content),
+            b'body { margin: 0; }\n' * 100,
+        )
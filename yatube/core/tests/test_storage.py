@@ -0,0 +1,41 @@
+import hashlib
+import os
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase
+
+from ..storage import ContentAddressedStorage
+
+
+class ContentAddressedStorageTest(SimpleTestCase):
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.storage = ContentAddressedStorage(location=self.location)
+
+    def tearDown(self):
+        shutil.rmtree(self.location, ignore_errors=True)
+
+    def test_name_from_content_hash(self):
+        digest = hashlib.sha256(b'image').hexdigest()
+        name = self.storage.save('posts/cat.JPG', ContentFile(b'image'))
+        self.assertEqual(
+            name, f'posts/{digest[:2]}/{digest[2:4]}/{digest}.jpg'
+        )
+
+    def test_identical_uploads_share_file(self):
+        first = self.storage.save('posts/a.png', ContentFile(b'same'))
+        second = self.storage.save('posts/b.png', ContentFile(b'same'))
+        other = self.storage.save('posts/c.png', ContentFile(b'other'))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertEqual(self.storage.open(second).read(), b'same')
+
+    def test_identical_upload_refreshes_mtime(self):
+        """Повторная загрузка молодит файл для grace-периода gc_media."""
+        name = self.storage.save('posts/a.png', ContentFile(b'same'))
+        path = self.storage.path(name)
+        os.utime(path, (0, 0))
+        self.storage.save('posts/b.png', ContentFile(b'same'))
+        self.assertGreater(os.path.getmtime(path), 0)
@@ -1,7 +1,53 @@
+import copy
+import mimetypes
+import os
+import posixpath
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.http import (
+    FileResponse, Http404, HttpResponse, HttpResponseNotFound
+)
 from django.shortcuts import render
+from django.template.loader import render_to_string
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.html import escape
+
+from .media import RangeFile, if_range_matches, parse_range, validators
+
+
+NOT_FOUND_PATH = '__not_found_path__'
+_not_found = {}
+
+
+def anonymous_not_found(request):
+    """Страница 404 для анонимного посетителя, отрендеренная заранее.
+
+    Шаблон рендерится раз в NOT_FOUND_CACHE_SECONDS с меткой вместо
+    адреса, дальше в готовую страницу только подставляется путь.
+    """
+    rendered_at, body = _not_found.get('body', (None, None))
+    now = time.monotonic()
+    if body is None or now - rendered_at > settings.NOT_FOUND_CACHE_SECONDS:
+        anonymous = copy.copy(request)
+        anonymous.user = AnonymousUser()
+        anonymous.resolver_match = None
+        body = render_to_string(
+            'core/404.html', {'path': NOT_FOUND_PATH}, anonymous
+        )
+        _not_found['body'] = (now, body)
+    return HttpResponseNotFound(
+        body.replace(NOT_FOUND_PATH, escape(request.path))
+    )
 
 
 def page_not_found(request, exception):
+    if not any(
+        name in request.COOKIES for name in settings.PAGE_CACHE_BYPASS_COOKIES
+    ):
+        return anonymous_not_found(request)
     return render(request, "core/404.html", {"path": request.path}, status=404)
 
 
@@ -11,3 +57,73 @@ def permission_denied(request, exception):
 
 def csrf_failure(request, reason=""):
     return render(request, "core/403csrf.html")
+
+
+def serve_media(request, path):
+    """Отдаёт загруженные картинки с Range, ETag и ответами 304.
+
+    При MEDIA_SENDFILE_HEADER сам файл отправляет веб-сервер, иначе он
+    передаётся через FileResponse, который WSGI-сервер может отдать
+    через sendfile.
+    """
+    path = posixpath.normpath(path).lstrip('/')
+    if not path.startswith(tuple(settings.MEDIA_SERVE_PREFIXES)):
+        raise Http404
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        stat = os.stat(full_path)
+    except (ValueError, OSError):
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+    headers = validators(stat)
+    headers['Cache-Control'] = f'public, max-age={settings.MEDIA_MAX_AGE}'
+    not_modified = get_conditional_response(
+        request, etag=headers['ETag'], last_modified=int(stat.st_mtime)
+    )
+    if not_modified is not None:
+        response = not_modified
+    elif settings.MEDIA_SENDFILE_HEADER:
+        response = sendfile_response(path, full_path)
+    else:
+        response = file_response(request, full_path, stat, headers['ETag'])
+    for name, value in headers.items():
+        response[name] = value
+    return response
+
+
+def sendfile_response(path, full_path):
+    """Пустой ответ, по заголовку которого файл отдаёт nginx или Apache."""
+    response = HttpResponse(content_type=mimetypes.guess_type(path)[0])
+    header = settings.MEDIA_SENDFILE_HEADER
+    if header == 'X-Accel-Redirect':
+        response[header] = settings.MEDIA_ACCEL_PREFIX + path
+    else:
+        response[header] = full_path
+    return response
+
+
+def file_response(request, full_path, stat, etag):
+    content_type = mimetypes.guess_type(full_path)[0]
+    size = stat.st_size
+    try:
+        byte_range = parse_range(request.META.get('HTTP_RANGE'), size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    if byte_range is None or not if_range_matches(
+        request.META.get('HTTP_IF_RANGE'), etag, stat.st_mtime
+    ):
+        response = FileResponse(open(full_path, 'rb'))
+    else:
+        start, end = byte_range
+        response = FileResponse(
+            RangeFile(open(full_path, 'rb'), start, end - start + 1),
+            status=206,
+        )
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    response['Content-Type'] = content_type or 'application/octet-stream'
+    response['Accept-Ranges'] = 'bytes'
+    return response
@@ -1,5 +1,71 @@
+from django import forms
 from django.contrib import admin
-from posts.models import Post, Group, Comment, Follow
+from django.contrib.admin import helpers
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin
+from django.shortcuts import render
+from posts.bulk import delete_posts, move_posts
+from posts.deletion import schedule_deletion
+from posts.models import (ArchivedPost, Post, Group, Comment, Follow,
+                          PendingDeletion)
+
+User = get_user_model()
+
+
+def delete_in_background(modeladmin, request, queryset):
+    for obj in queryset:
+        schedule_deletion(obj)
+    modeladmin.message_user(
+        request, f'Помечено на фоновое удаление: {len(queryset)}'
+    )
+
+
+delete_in_background.short_description = 'Удалить в фоне'
+delete_in_background.allowed_permissions = ('delete',)
+
+
+class MoveToGroupForm(forms.Form):
+    group = forms.ModelChoiceField(Group.objects.all(), label='Группа')
+
+
+def move_to_group(modeladmin, request, queryset):
+    form = MoveToGroupForm(request.POST if 'apply' in request.POST else None)
+    if form.is_valid():
+        moved = move_posts([queryset], form.cleaned_data['group'])
+        modeladmin.message_user(request, f'Перенесено постов: {moved}')
+        return None
+    context = {
+        **modeladmin.admin_site.each_context(request),
+        'title': 'Перенос в группу',
+        'opts': modeladmin.model._meta,
+        'form': form,
+        'queryset': queryset,
+        'select_across': request.POST.get('select_across') == '1',
+        'action_checkbox_name': helpers.ACTION_CHECKBOX_NAME,
+    }
+    return render(request, 'admin/posts/post/move_to_group.html', context)
+
+
+move_to_group.short_description = 'Перенести в группу'
+move_to_group.allowed_permissions = ('change',)
+
+
+def clear_group(modeladmin, request, queryset):
+    cleared = move_posts([queryset], None)
+    modeladmin.message_user(request, f'Убрано из групп постов: {cleared}')
+
+
+clear_group.short_description = 'Убрать из группы'
+clear_group.allowed_permissions = ('change',)
+
+
+def delete_in_batches(modeladmin, request, queryset):
+    deleted = delete_posts([queryset])
+    modeladmin.message_user(request, f'Удалено постов: {deleted}')
+
+
+delete_in_batches.short_description = 'Удалить пачками'
+delete_in_batches.allowed_permissions = ('delete',)
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -14,9 +80,29 @@ class PostAdmin(admin.ModelAdmin):
     search_fields = ('text',)
     list_filter = ('pub_date',)
     empty_value_display = '-пусто-'
+    actions = (
+        move_to_group, clear_group, delete_in_batches, delete_in_background
+    )
+
+
+class GroupAdmin(admin.ModelAdmin):
+    actions = (delete_in_background,)
+
+
+class BackgroundDeleteUserAdmin(UserAdmin):
+    actions = (delete_in_background,)
+
+
+class PendingDeletionAdmin(admin.ModelAdmin):
+    list_display = ('content_type', 'object_id', 'requested',
+                    'deleted_objects')
 
 
 admin.site.register(Post, PostAdmin)
-admin.site.register(Group)
+admin.site.register(Group, GroupAdmin)
 admin.site.register(Comment)
 admin.site.register(Follow)
+admin.site.register(ArchivedPost)
+admin.site.register(PendingDeletion, PendingDeletionAdmin)
+admin.site.unregister(User)
+admin.site.register(User, BackgroundDeleteUserAdmin)
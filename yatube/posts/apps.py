@@ -3,3 +3,13 @@ from django.apps import AppConfig
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self):
+        from django.contrib.auth import get_user_model
+        from django.db.models.signals import post_save
+        from . import sharding, signals  # noqa: F401
+        from .models import Group, Post
+
+        post_save.connect(sharding.mirror_to_shards, sender=get_user_model())
+        post_save.connect(sharding.mirror_to_shards, sender=Group)
+        post_save.connect(sharding.track_location, sender=Post)
@@ -0,0 +1,103 @@
+from django.db import transaction
+
+from core.entities import forget, get_cached_object
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+from .sharding import max_post_id
+from .signals import muted
+
+
+class ArchiveFeed:
+    """Лента: сначала горячие посты, за ними архивные.
+
+    В архив попадают только посты старше горячих, поэтому склейка
+    сохраняет порядок по дате. Архив читается, только когда страница
+    выходит за пределы горячей части; COUNT(*) по горячей части нужен,
+    только если страница целиком лежит в архиве.
+    """
+
+    def __init__(self, hot, archived):
+        self.hot = hot
+        self.archived = archived
+        self._hot_count = None
+
+    def hot_count(self):
+        if self._hot_count is None:
+            self._hot_count = self.hot.count()
+        return self._hot_count
+
+    def count(self):
+        return self.hot_count() + self.archived.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        start, stop = key.start or 0, key.stop
+        posts = list(self.hot[start:stop])
+        if len(posts) == stop - start:
+            return posts
+        if posts:
+            self._hot_count = start + len(posts)
+        hot_count = self.hot_count()
+        return posts + list(self.archived[
+            max(start - hot_count, 0):stop - hot_count
+        ])
+
+
+def get_post_or_archived(queryset, post_id):
+    """Пост из горячей таблицы (через кэш объектов) или из архива.
+
+    id больше наибольшего существующего отсекаются без запроса к базе.
+    """
+    if post_id > max_post_id():
+        return None
+    post = get_cached_object(queryset, pk=post_id)
+    if post is None:
+        post = ArchivedPost.objects.filter(pk=post_id).first()
+    return post
+
+
+def archive_batch(alias, cutoff, batch_size):
+    """Переносит в архив одну пачку постов старше cutoff с комментариями.
+
+    Возвращает число перенесённых постов. Статистику групп перенос
+    не меняет: архивные посты по-прежнему принадлежат группе.
+    """
+    with transaction.atomic(using=alias), transaction.atomic():
+        posts = list(
+            Post.objects.using(alias)
+            .filter(pub_date__lt=cutoff)
+            .order_by('pub_date')[:batch_size]
+        )
+        if not posts:
+            return 0
+        ids = [post.pk for post in posts]
+        ArchivedPost.objects.bulk_create([
+            ArchivedPost(
+                id=post.pk,
+                text=post.text,
+                text_html=post.text_html,
+                pub_date=post.pub_date,
+                created=post.created,
+                author_id=post.author_id,
+                group_id=post.group_id,
+                image=post.image.name,
+            )
+            for post in posts
+        ], ignore_conflicts=True)
+        ArchivedComment.objects.bulk_create([
+            ArchivedComment(
+                post_id=comment.post_id,
+                author_id=comment.author_id,
+                text=comment.text,
+                text_html=comment.text_html,
+                created=comment.created,
+            )
+            for comment in Comment.objects.using(alias).filter(post__in=ids)
+        ])
+        with muted():
+            Post.objects.using(alias).filter(pk__in=ids).delete()
+    forget(Post, 'pk', *ids)
+    return len(posts)
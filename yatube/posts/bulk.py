@@ -0,0 +1,119 @@
+import time
+
+from django.conf import settings
+
+from core.entities import forget
+from . import counts, pages, stats
+from .models import Mention, Post, PostTag
+from .signals import muted
+
+
+class Touched:
+    """Что затронула массовая операция: по этому сбрасываются кэши."""
+
+    def __init__(self):
+        self.post_ids = set()
+        self.author_ids = set()
+        self.group_ids = set()
+
+    def add(self, rows):
+        for pk, author_id, group_id in rows:
+            self.post_ids.add(pk)
+            self.author_ids.add(author_id)
+            if group_id:
+                self.group_ids.add(group_id)
+
+
+def shard_querysets(**filters):
+    """Посты по фильтру в каждом шарде."""
+    return [
+        Post.objects.using(alias).filter(**filters)
+        for alias in settings.POST_SHARDS
+    ]
+
+
+def batches(queryset, batch_size):
+    """Строки (pk, author_id, group_id) пачками по возрастанию pk.
+
+    Следующая пачка начинается после последнего pk предыдущей, поэтому
+    изменённые строки не читаются повторно.
+    """
+    queryset = queryset.order_by('pk')
+    last = None
+    while True:
+        page = queryset if last is None else queryset.filter(pk__gt=last)
+        rows = list(page.values_list('pk', 'author_id', 'group_id')[
+            :batch_size
+        ])
+        if not rows:
+            return
+        last = rows[-1][0]
+        yield rows
+
+
+def move_posts(querysets, group, batch_size=None, pause=None):
+    """Переносит посты в группу, при group=None убирает из группы.
+
+    Каждая пачка — один UPDATE, обработчики сигналов отключены;
+    статистика, счётчики и кэши обновляются один раз в конце.
+    Возвращает число перенесённых постов.
+    """
+    touched = Touched()
+    for queryset in querysets:
+        if group is None:
+            queryset = queryset.filter(group__isnull=False)
+        else:
+            queryset = queryset.exclude(group=group)
+        for rows in _each(queryset, batch_size, pause):
+            queryset.model.objects.using(queryset.db).filter(
+                pk__in=[row[0] for row in rows]
+            ).update(group=group)
+            touched.add(rows)
+    if group is not None and touched.post_ids:
+        touched.group_ids.add(group.pk)
+    invalidate(touched)
+    return len(touched.post_ids)
+
+
+def delete_posts(querysets, batch_size=None, pause=None):
+    """Удаляет посты с комментариями и индексом тегов пачками.
+
+    Возвращает число удалённых постов.
+    """
+    touched = Touched()
+    for queryset in querysets:
+        for rows in _each(queryset, batch_size, pause):
+            ids = [row[0] for row in rows]
+            with muted():
+                queryset.model.objects.using(queryset.db).filter(
+                    pk__in=ids
+                ).delete()
+            PostTag.objects.filter(post_id__in=ids).delete()
+            Mention.objects.filter(post_id__in=ids).delete()
+            touched.add(rows)
+    invalidate(touched)
+    return len(touched.post_ids)
+
+
+def _each(queryset, batch_size, pause):
+    if batch_size is None:
+        batch_size = settings.BULK_POSTS_BATCH_SIZE
+    if pause is None:
+        pause = settings.BULK_POSTS_PAUSE
+    for index, rows in enumerate(batches(queryset, batch_size)):
+        if index and pause:
+            time.sleep(pause)
+        yield rows
+
+
+def invalidate(touched):
+    """Одно обновление статистики и кэшей вместо обработчиков на строку."""
+    if not touched.post_ids:
+        return
+    if touched.group_ids:
+        stats.refresh_stats(touched.group_ids)
+    counts.posts_changed(touched.author_ids, touched.group_ids)
+    pages.posts_changed(
+        touched.post_ids, touched.author_ids, touched.group_ids
+    )
+    forget(Post, 'pk', *touched.post_ids)
@@ -0,0 +1,35 @@
+from core.paginator import invalidate_counts
+from .models import Follow
+
+INDEX = 'index'
+GROUPS = 'groups'
+
+
+def group_scope(group_id):
+    return f'group:{group_id}'
+
+
+def author_scope(author_id):
+    return f'author:{author_id}'
+
+
+def follow_scope(user_id):
+    return f'follow:{user_id}'
+
+
+def post_changed(author_id, group_ids=()):
+    """Сбрасывает число постов во всех лентах, где виден пост автора."""
+    posts_changed([author_id], group_ids)
+
+
+def posts_changed(author_ids, group_ids=()):
+    """То же для постов нескольких авторов одним удалением из кэша."""
+    followers = Follow.objects.filter(author_id__in=author_ids).values_list(
+        'user_id', flat=True
+    ).distinct()
+    invalidate_counts(
+        INDEX,
+        *(author_scope(author_id) for author_id in author_ids),
+        *(group_scope(group_id) for group_id in group_ids if group_id),
+        *(follow_scope(user_id) for user_id in followers),
+    )
@@ -0,0 +1,116 @@
+import logging
+import time
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import CASCADE, F
+
+from .models import ArchivedPost, Group, PendingDeletion, Post, User
+from .sharding import SHARDED_MODELS
+
+logger = logging.getLogger(__name__)
+
+
+def schedule_deletion(obj):
+    """Помечает объект на фоновое удаление.
+
+    Пользователь сразу теряет возможность войти, остальное делает
+    команда process_deletions.
+    """
+    if isinstance(obj, User) and obj.is_active:
+        User.objects.filter(pk=obj.pk).update(is_active=False)
+    PendingDeletion.objects.get_or_create(
+        content_type=ContentType.objects.get_for_model(obj),
+        object_id=obj.pk,
+    )
+
+
+def _aliases(model):
+    if model._meta.label_lower in SHARDED_MODELS:
+        return settings.POST_SHARDS
+    return ['default']
+
+
+def _cascade(model, obj, path=None, seen=()):
+    """Записи, ссылающиеся на obj через каскадные связи model.
+
+    Связи берутся из _meta, как у каскадного удаления Django, включая
+    скрытые (related_name='+'), поэтому новые модели учитываются
+    без правок здесь. Сначала отдаются самые дальние записи: комментарии
+    к постам пользователя раньше самих постов.
+    """
+    for relation in model._meta.get_fields(include_hidden=True):
+        if not (
+            relation.auto_created and not relation.concrete
+            and (relation.one_to_many or relation.one_to_one)
+        ):
+            continue
+        related = relation.related_model
+        if relation.on_delete is not CASCADE or related in seen:
+            continue
+        lookup = relation.field.name
+        if path:
+            lookup = f'{lookup}__{path}'
+        yield from _cascade(related, obj, lookup, (*seen, related))
+        for alias in _aliases(related):
+            yield related._default_manager.using(alias).filter(
+                **{lookup: obj}
+            )
+
+
+def dependents(obj):
+    """Наборы записей, которые надо удалить раньше самого объекта."""
+    return _cascade(type(obj), obj, seen=(type(obj),))
+
+
+def delete_in_batches(queryset, batch_size, pause, pending):
+    """Удаляет записи пачками, каждая пачка — отдельная транзакция."""
+    model = queryset.model
+    while True:
+        ids = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return
+        deleted, _ = model.objects.using(queryset.db).filter(
+            pk__in=ids
+        ).delete()
+        PendingDeletion.objects.filter(pk=pending.pk).update(
+            deleted_objects=F('deleted_objects') + deleted
+        )
+        logger.info('%s: удалено %s записей %s', pending, deleted, model)
+        time.sleep(pause)
+
+
+def unlink_group(group, batch_size, pause):
+    """Отвязывает посты от группы пачками вместо одного большого UPDATE."""
+    querysets = [Post.objects.using(alias) for alias in settings.POST_SHARDS]
+    querysets.append(ArchivedPost.objects.all())
+    for queryset in querysets:
+        while True:
+            ids = list(
+                queryset.filter(group=group)
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            queryset.filter(pk__in=ids).update(group=None)
+            time.sleep(pause)
+
+
+def process(pending, batch_size, pause):
+    """Удаляет объект и всё, что от него зависит, небольшими пачками.
+
+    Пост ищется в своём шарде, остальные объекты — в основной базе.
+    """
+    model = pending.content_type.model_class()
+    if model is Post:
+        queryset = Post.objects.locate(pending.object_id)
+    else:
+        queryset = model._default_manager.all()
+    obj = queryset.get(pk=pending.object_id)
+    if isinstance(obj, Group):
+        unlink_group(obj, batch_size, pause)
+    for queryset in dependents(obj):
+        delete_in_batches(queryset, batch_size, pause, pending)
+    obj.delete()
+    pending.delete()
+    logger.info('%s: удаление завершено', pending)
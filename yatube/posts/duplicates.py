@@ -0,0 +1,64 @@
+import logging
+import threading
+
+from django.conf import settings
+from django.db import DatabaseError, connections
+
+from core.simhash import SimHashIndex, simhash, words
+from .models import Comment, Post
+
+logger = logging.getLogger(__name__)
+index = SimHashIndex(settings.DUPLICATE_INDEX_SIZE)
+_warm = threading.Event()
+_loading = threading.Lock()
+
+
+def _checked(text):
+    return len(words(text)) >= settings.DUPLICATE_MIN_WORDS
+
+
+def warm_up():
+    """Запускает заполнение индекса в фоновом потоке, один раз.
+
+    Запрос не ждёт загрузки: пока она идёт, тексты сверяются с тем,
+    что уже есть в индексе.
+    """
+    if _warm.is_set() or not _loading.acquire(blocking=False):
+        return
+    threading.Thread(target=_load, daemon=True).start()
+
+
+def _load():
+    """Последние посты и комментарии в индекс; флаг — после загрузки.
+
+    При ошибке базы загрузка повторится со следующей проверкой.
+    """
+    try:
+        load()
+        _warm.set()
+    except DatabaseError as error:
+        logger.warning('Индекс дубликатов не заполнен: %s', error)
+    finally:
+        connections.close_all()
+        _loading.release()
+
+
+def load():
+    limit = settings.DUPLICATE_INDEX_SIZE // 2
+    for model in (Post, Comment):
+        texts = model.objects.order_by('-pk').values_list('text', flat=True)
+        for text in reversed(texts[:limit]):
+            remember(text)
+
+
+def remember(text):
+    if _checked(text):
+        index.add(simhash(text))
+
+
+def is_duplicate(text):
+    """Есть ли среди недавних текстов почти такой же."""
+    if not _checked(text):
+        return False
+    warm_up()
+    return index.contains_near(simhash(text))
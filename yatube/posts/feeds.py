@@ -0,0 +1,31 @@
+import heapq
+from itertools import islice
+
+from core.cursors import after_cursor, split_page
+
+
+def feed_page(hot, archived, cursor, size):
+    """Страница ленты после курсора: горячие посты всех шардов, затем архив.
+
+    hot — queryset или MergedFeed. С каждого шарда читается не больше
+    size + 1 строк от позиции курсора, архив — только если горячих
+    не хватило: архивные посты всегда старше горячих, поэтому тот же
+    курсор подходит и для него. Возвращает посты и курсор следующей страницы.
+    """
+    querysets = getattr(hot, 'querysets', [hot])
+    merged = heapq.merge(
+        *(
+            after_cursor(queryset, cursor).select_related('author', 'group')
+            [:size + 1]
+            for queryset in querysets
+        ),
+        key=lambda post: (post.pub_date, post.pk),
+        reverse=True,
+    )
+    posts = list(islice(merged, size + 1))
+    if len(posts) <= size:
+        posts += list(
+            after_cursor(archived, cursor).select_related('author', 'group')
+            [:size + 1 - len(posts)]
+        )
+    return split_page(posts, size)
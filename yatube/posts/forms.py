@@ -1,6 +1,10 @@
+from django.core.exceptions import ValidationError
 from django.forms import ModelForm
+from .duplicates import is_duplicate
 from .models import Post, Comment
 
+DUPLICATE_MESSAGE = 'Почти такой же текст уже публиковали'
+
 
 class PostForm(ModelForm):
     class Meta:
@@ -12,6 +16,12 @@ class PostForm(ModelForm):
             'group': 'Группа, к которой будет относиться пост',
         }
 
+    def clean_text(self):
+        text = self.cleaned_data['text']
+        if self.instance.pk is None and is_duplicate(text):
+            raise ValidationError(DUPLICATE_MESSAGE)
+        return text
+
 
 class CommentForm(ModelForm):
     class Meta:
@@ -23,3 +33,9 @@ class CommentForm(ModelForm):
         help_texts = {
             'text': 'Текст нового комментария',
         }
+
+    def clean_text(self):
+        text = self.cleaned_data['text']
+        if is_duplicate(text):
+            raise ValidationError(DUPLICATE_MESSAGE)
+        return text
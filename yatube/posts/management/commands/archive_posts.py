@@ -0,0 +1,30 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from posts.archive import archive_batch
+
+
+class Command(BaseCommand):
+    help = 'Переносит старые посты и их комментарии в архивные таблицы.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.POST_ARCHIVE_DAYS
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.POST_ARCHIVE_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        for alias in settings.POST_SHARDS:
+            total = 0
+            while True:
+                moved = archive_batch(alias, cutoff, options['batch_size'])
+                if not moved:
+                    break
+                total += moved
+                self.stdout.write(f'{alias}: в архиве {total} постов')
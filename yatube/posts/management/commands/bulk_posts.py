@@ -0,0 +1,80 @@
+from datetime import datetime, time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from posts.bulk import delete_posts, move_posts, shard_querysets
+from posts.models import Group, User
+
+
+def parse_date(value):
+    try:
+        day = datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise CommandError(f'Дата должна быть в формате ГГГГ-ММ-ДД: {value}')
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит посты в другую группу, убирает из группы или удаляет '
+        'их по фильтру пачками, с одним обновлением счётчиков и кэшей.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('action', choices=('move', 'clear', 'delete'))
+        parser.add_argument(
+            '--to', metavar='SLUG', help='Группа, куда переносить посты.'
+        )
+        parser.add_argument('--group', metavar='SLUG')
+        parser.add_argument('--author', metavar='USERNAME')
+        parser.add_argument(
+            '--before', type=parse_date, metavar='ГГГГ-ММ-ДД',
+            help='Только посты, опубликованные раньше этой даты.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.BULK_POSTS_BATCH_SIZE
+        )
+        parser.add_argument(
+            '--pause', type=float, default=settings.BULK_POSTS_PAUSE,
+            help='Пауза между пачками в секундах.'
+        )
+
+    def handle(self, *args, **options):
+        filters = {}
+        if options['group']:
+            filters['group'] = self.get(Group, slug=options['group'])
+        if options['author']:
+            filters['author'] = self.get(User, username=options['author'])
+        if options['before']:
+            filters['pub_date__lt'] = options['before']
+        if not filters:
+            raise CommandError('Нужен хотя бы один фильтр.')
+        querysets = shard_querysets(**filters)
+        batching = {
+            'batch_size': options['batch_size'],
+            'pause': options['pause'],
+        }
+        action = options['action']
+        if action == 'delete':
+            done = delete_posts(querysets, **batching)
+            self.stdout.write(f'Удалено постов: {done}')
+            return
+        if action == 'move':
+            if not options['to']:
+                raise CommandError('Для move нужна группа --to.')
+            group = self.get(Group, slug=options['to'])
+        else:
+            group = None
+        done = move_posts(querysets, group, **batching)
+        self.stdout.write(f'Перенесено постов: {done}')
+
+    def get(self, model, **lookup):
+        try:
+            return model.objects.get(**lookup)
+        except model.DoesNotExist:
+            raise CommandError(
+                f'{model._meta.verbose_name} не найден: '
+                f'{next(iter(lookup.values()))}'
+            )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.trending import recompute
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает популярные посты и группы по счётчикам событий. '
+        'Запускать каждые несколько минут.'
+    )
+
+    def handle(self, *args, **options):
+        recompute()
+        self.stdout.write('Рейтинги обновлены')
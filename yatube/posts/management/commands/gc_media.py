@@ -0,0 +1,97 @@
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from sorl.thumbnail import default
+from sorl.thumbnail.images import ImageFile
+
+from posts.models import ArchivedPost, Post
+
+
+def walk(root):
+    """Файлы дерева потоком: os.scandir без списка всех путей в памяти."""
+    with os.scandir(root) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from walk(entry.path)
+            elif entry.is_file(follow_symlinks=False):
+                yield entry
+
+
+def referenced_images():
+    """Имена всех картинок, на которые ссылаются посты и архив."""
+    querysets = [Post.objects.using(alias) for alias in settings.POST_SHARDS]
+    querysets.append(ArchivedPost.objects.all())
+    names = set()
+    for queryset in querysets:
+        names.update(
+            queryset.exclude(image='')
+            .values_list('image', flat=True)
+            .iterator()
+        )
+    return names
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет картинки постов, на которые больше нет ссылок, '
+        'вместе с миниатюрами sorl-thumbnail.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, что будет удалено.'
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.MEDIA_GC_BATCH_SIZE
+        )
+        parser.add_argument(
+            '--pause', type=float, default=settings.MEDIA_GC_PAUSE,
+            help='Пауза между пачками в секундах.'
+        )
+        parser.add_argument(
+            '--grace-hours', type=float, default=settings.MEDIA_GC_GRACE_HOURS,
+            help='Не трогать файлы моложе этого возраста.'
+        )
+
+    def handle(self, *args, **options):
+        storage = Post._meta.get_field('image').storage
+        root = storage.path('posts')
+        if not os.path.isdir(root):
+            return
+        referenced = referenced_images()
+        cutoff = time.time() - options['grace_hours'] * 60 * 60
+        batch = []
+        found = size = 0
+        for entry in walk(root):
+            name = os.path.relpath(entry.path, storage.location).replace(
+                os.sep, '/'
+            )
+            stat = entry.stat(follow_symlinks=False)
+            if name in referenced or stat.st_mtime > cutoff:
+                continue
+            found += 1
+            size += stat.st_size
+            if options['dry_run']:
+                self.stdout.write(name)
+                continue
+            batch.append(name)
+            if len(batch) >= options['batch_size']:
+                self.delete(batch, storage)
+                batch = []
+                time.sleep(options['pause'])
+        if batch:
+            self.delete(batch, storage)
+        if not options['dry_run']:
+            default.kvstore.cleanup()
+        action = 'Найдено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(
+            f'{action} файлов без ссылок: {found}, {size / 2 ** 20:.1f} МБ'
+        )
+
+    def delete(self, names, storage):
+        """Удаляет файлы и их миниатюры вместе с записями в kvstore."""
+        for name in names:
+            default.backend.delete(ImageFile(name, storage=storage))
@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.models import ArchivedPost, Post
+from posts.tags import index_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Строит индекс хэштегов и упоминаний по существующим постам. '
+        'Посты читаются потоком, пачками по pk.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.TAG_INDEX_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        querysets = [
+            Post.objects.using(alias) for alias in settings.POST_SHARDS
+        ]
+        querysets.append(ArchivedPost.objects.all())
+        for queryset in querysets:
+            total = 0
+            last_pk = 0
+            while True:
+                rows = list(
+                    queryset.filter(pk__gt=last_pk)
+                    .order_by('pk')
+                    .values_list('pk', 'text', 'pub_date')
+                    [:options['batch_size']]
+                )
+                if not rows:
+                    break
+                index_posts(rows)
+                last_pk = rows[-1][0]
+                total += len(rows)
+            self.stdout.write(
+                f'{queryset.model.__name__} ({queryset.db}): '
+                f'проиндексировано {total}'
+            )
@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.core.management.base import BaseCommand
+
+from posts.deletion import process
+from posts.models import PendingDeletion
+
+
+class Command(BaseCommand):
+    help = 'Удаляет помеченные объекты и их зависимости небольшими пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.DELETION_BATCH_SIZE
+        )
+        parser.add_argument(
+            '--pause', type=float, default=settings.DELETION_PAUSE,
+            help='Пауза между пачками в секундах.'
+        )
+
+    def handle(self, *args, **options):
+        for pending in PendingDeletion.objects.select_related('content_type'):
+            self.stdout.write(f'Удаляется {pending}')
+            try:
+                process(pending, options['batch_size'], options['pause'])
+            except ObjectDoesNotExist:
+                pending.delete()
@@ -0,0 +1,79 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.entities import forget
+from posts.models import Comment, Group, Post, User
+from posts.sharding import remember_location, shard_for_author
+from posts.signals import muted
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит посты и комментарии авторов в шарды, '
+        'соответствующие текущему списку POST_SHARDS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if not options['dry_run']:
+            for alias in settings.POST_SHARDS:
+                if alias != 'default':
+                    self.sync_references(alias, batch_size)
+        for source in settings.POST_SHARDS:
+            author_ids = (
+                Post.objects.using(source)
+                .values_list('author_id', flat=True)
+                .distinct()
+            )
+            for author_id in author_ids.iterator():
+                target = shard_for_author(author_id)
+                if target == source:
+                    continue
+                self.stdout.write(f'Автор {author_id}: {source} -> {target}')
+                if not options['dry_run']:
+                    self.move_author(author_id, source, target, batch_size)
+
+    def sync_references(self, alias, batch_size):
+        """Пользователи и группы нужны в каждом шарде для внешних ключей."""
+        for model in (User, Group):
+            objects = model.objects.order_by('pk').iterator(batch_size)
+            batch = []
+            for obj in objects:
+                batch.append(obj)
+                if len(batch) == batch_size:
+                    model.objects.using(alias).bulk_create(
+                        batch, ignore_conflicts=True
+                    )
+                    batch = []
+            model.objects.using(alias).bulk_create(
+                batch, ignore_conflicts=True
+            )
+
+    def move_author(self, author_id, source, target, batch_size):
+        posts = Post.objects.using(source).filter(author_id=author_id)
+        moved = 0
+        while True:
+            batch = list(posts.order_by('pk')[:batch_size])
+            if not batch:
+                break
+            comments = list(
+                Comment.objects.using(source).filter(post__in=batch)
+            )
+            with transaction.atomic(using=target):
+                Post.objects.using(target).bulk_create(batch)
+                Comment.objects.using(target).bulk_create(comments)
+            for post in batch:
+                remember_location(post.pk, target)
+            ids = [post.pk for post in batch]
+            # Пост не удаляется, а переезжает: обработчики удаления
+            # вычли бы его из статистики групп и индекса тегов.
+            with transaction.atomic(using=source), muted():
+                Post.objects.using(source).filter(pk__in=ids).delete()
+            forget(Post, 'pk', *ids)
+            moved += len(batch)
+            self.stdout.write(f'  перенесено постов: {moved}')
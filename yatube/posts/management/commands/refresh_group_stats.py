@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from posts.stats import refresh_stats
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает статистику всех групп. Запускать раз в сутки.'
+
+    def handle(self, *args, **options):
+        refresh_stats()
+        self.stdout.write('Статистика групп обновлена')
@@ -0,0 +1,60 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.markup import render
+from posts.models import ArchivedComment, ArchivedPost, Comment, Post
+
+
+def rerender(queryset, batch_size):
+    """Перерисовывает text_html пачками по pk, пишет только изменённые.
+
+    Возвращает число обновлённых записей.
+    """
+    updated = 0
+    last_pk = 0
+    while True:
+        rows = list(
+            queryset.filter(pk__gt=last_pk)
+            .order_by('pk')
+            .values_list('pk', 'text', 'text_html')[:batch_size]
+        )
+        if not rows:
+            return updated
+        last_pk = rows[-1][0]
+        changed = []
+        for pk, text, old_html in rows:
+            html = render(text)
+            if html != old_html:
+                changed.append(queryset.model(pk=pk, text_html=html))
+        queryset.bulk_update(changed, ['text_html'])
+        updated += len(changed)
+
+
+class Command(BaseCommand):
+    help = (
+        'Заново рендерит HTML постов и комментариев. '
+        'Запускать после изменения правил в core.markup.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=settings.RERENDER_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        querysets = [
+            model.objects.using(alias)
+            for alias in settings.POST_SHARDS
+            for model in (Post, Comment)
+        ]
+        querysets += [
+            ArchivedPost.objects.all(),
+            ArchivedComment.objects.all(),
+        ]
+        for queryset in querysets:
+            updated = rerender(queryset, batch_size)
+            self.stdout.write(
+                f'{queryset.model.__name__} ({queryset.db}): '
+                f'обновлено {updated}'
+            )
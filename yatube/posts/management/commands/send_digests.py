@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts.notifications import build_digests
+
+
+class Command(BaseCommand):
+    help = (
+        'Собирает журнал уведомлений в сводки для получателей. '
+        'Запускать периодически, например раз в час.'
+    )
+
+    def handle(self, *args, **options):
+        created = build_digests()
+        self.stdout.write(f'Создано сводок: {created}')
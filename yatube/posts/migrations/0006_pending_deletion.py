@@ -0,0 +1,31 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:41
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('posts', '0005_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PendingDeletion',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.BigIntegerField()),
+                ('requested', models.DateTimeField(auto_now_add=True, verbose_name='Дата запроса')),
+                ('deleted_objects', models.PositiveIntegerField(default=0, verbose_name='Удалено записей')),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.ContentType')),
+            ],
+            options={
+                'verbose_name': 'Отложенное удаление',
+                'verbose_name_plural': 'Отложенные удаления',
+                'ordering': ('requested',),
+                'unique_together': {('content_type', 'object_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:42
+
+from datetime import timedelta
+
+from django.db import migrations, models
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+import django.db.models.deletion
+
+
+def create_group_stats(apps, schema_editor):
+    """Та же агрегация, что у posts.stats.refresh_stats, на исторических
+    моделях: постов всего и за неделю, дата последнего, с учётом архива.
+    """
+    alias = schema_editor.connection.alias
+    Group = apps.get_model('posts', 'Group')
+    GroupStats = apps.get_model('posts', 'GroupStats')
+    ArchivedPost = apps.get_model('posts', 'ArchivedPost')
+    week_ago = timezone.now() - timedelta(days=7)
+    hot = Group.objects.using(alias).annotate(
+        total=Count('posts'),
+        week=Count('posts', filter=Q(posts__pub_date__gte=week_ago)),
+        last=Max('posts__pub_date'),
+    ).values_list('pk', 'total', 'week', 'last')
+    archived = {
+        group_id: (total, last)
+        for group_id, total, last in (
+            ArchivedPost.objects.using(alias)
+            .filter(group__isnull=False)
+            .order_by()
+            .values('group')
+            .annotate(total=Count('pk'), last=Max('pub_date'))
+            .values_list('group', 'total', 'last')
+        )
+    }
+    stats = []
+    for group_id, total, week, last in hot.iterator():
+        archived_total, archived_last = archived.get(group_id, (0, None))
+        stats.append(GroupStats(
+            group_id=group_id,
+            post_count=total + archived_total,
+            week_post_count=week,
+            last_post_at=last or archived_last,
+        ))
+    GroupStats.objects.using(alias).bulk_create(stats, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0006_pending_deletion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupStats',
+            fields=[
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='posts.Group')),
+                ('post_count', models.PositiveIntegerField(default=0, verbose_name='Всего постов')),
+                ('week_post_count', models.PositiveIntegerField(default=0, verbose_name='Постов за неделю')),
+                ('last_post_at', models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Последний пост')),
+            ],
+            options={
+                'verbose_name': 'Статистика группы',
+                'verbose_name_plural': 'Статистика групп',
+                'ordering': ('-last_post_at',),
+            },
+        ),
+        migrations.RunPython(create_group_stats, migrations.RunPython.noop),
+    ]
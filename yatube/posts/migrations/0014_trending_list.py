@@ -0,0 +1,21 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_content_addressed_images'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingList',
+            fields=[
+                ('kind', models.CharField(max_length=10, primary_key=True, serialize=False)),
+                ('items', models.TextField(default='[]')),
+                ('updated', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
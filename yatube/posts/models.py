@@ -1,7 +1,10 @@
 from django.db import models
 from django.contrib.auth import get_user_model
-from core.models import CreatedModel
+from django.contrib.contenttypes.models import ContentType
+from core.models import CreatedModel, RenderedTextModel
+from core.storage import ContentAddressedStorage
 from django.db.models import CheckConstraint, Q, F
+from .sharding import ShardedPostManager, is_sharded, new_post_id
 
 
 User = get_user_model()
@@ -16,14 +19,48 @@ class Group(models.Model):
         return self.title
 
 
-class Post(CreatedModel):
+class GroupStats(models.Model):
+    """Счётчики группы, обновляемые при сохранении и удалении постов.
+
+    Число постов за неделю увеличивается сразу, а устаревшие посты из него
+    вычитает команда refresh_group_stats.
+    """
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+    post_count = models.PositiveIntegerField('Всего постов', default=0)
+    week_post_count = models.PositiveIntegerField(
+        'Постов за неделю',
+        default=0
+    )
+    last_post_at = models.DateTimeField(
+        'Последний пост',
+        blank=True,
+        null=True,
+        db_index=True
+    )
+
+    class Meta:
+        ordering = ('-last_post_at',)
+        verbose_name = 'Статистика группы'
+        verbose_name_plural = 'Статистика групп'
+
+    def __str__(self):
+        return str(self.group_id)
+
+
+class Post(CreatedModel, RenderedTextModel):
     text = models.TextField(
         'Текст поста',
         help_text='Введите текст поста'
     )
     pub_date = models.DateTimeField(
         'Дата публикации',
-        auto_now_add=True
+        auto_now_add=True,
+        db_index=True
     )
     author = models.ForeignKey(
         User,
@@ -42,8 +79,16 @@ class Post(CreatedModel):
     image = models.ImageField(
         'Картинка',
         upload_to='posts/',
+        storage=ContentAddressedStorage(),
         blank=True
     )
+    view_count = models.PositiveIntegerField(
+        'Просмотры',
+        default=0,
+        editable=False
+    )
+
+    objects = ShardedPostManager()
 
     class Meta:
         ordering = ('-pub_date',)
@@ -53,8 +98,14 @@ class Post(CreatedModel):
     def __str__(self):
         return self.text[:15]
 
+    def save(self, *args, **kwargs):
+        if self.pk is None and is_sharded():
+            self.pk = new_post_id()
+            kwargs.setdefault('force_insert', True)
+        super().save(*args, **kwargs)
 
-class Comment(CreatedModel):
+
+class Comment(CreatedModel, RenderedTextModel):
     post = models.ForeignKey(
         Post,
         blank=True,
@@ -97,3 +148,218 @@ class Follow(models.Model):
                 name='user_not_author',
             ),
         ]
+
+
+class ArchivedPost(RenderedTextModel):
+    """Пост, перенесённый из горячей таблицы командой archive_posts.
+
+    pk совпадает с pk исходного поста, поэтому старые ссылки работают.
+    """
+    is_archived = True
+
+    id = models.BigIntegerField(primary_key=True)
+    text = models.TextField('Текст поста')
+    pub_date = models.DateTimeField('Дата публикации', db_index=True)
+    created = models.DateTimeField('Дата создания')
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_posts',
+        verbose_name='Автор'
+    )
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.SET_NULL,
+        related_name='archived_posts',
+        blank=True,
+        null=True,
+        verbose_name='Группа'
+    )
+    image = models.ImageField(
+        'Картинка',
+        upload_to='posts/',
+        storage=ContentAddressedStorage(),
+        blank=True
+    )
+
+    class Meta:
+        ordering = ('-pub_date',)
+        verbose_name = 'Архивный пост'
+        verbose_name_plural = 'Архивные посты'
+
+    def __str__(self):
+        return self.text[:15]
+
+
+class ArchivedComment(RenderedTextModel):
+    post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        related_name='comments',
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_comments',
+    )
+    text = models.TextField('Текст комментария')
+    created = models.DateTimeField('Дата создания')
+
+    class Meta:
+        ordering = ('-created',)
+
+    def __str__(self):
+        return self.text[:15]
+
+
+class PendingDeletion(models.Model):
+    """Объект, зависимые записи которого удаляет process_deletions."""
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.BigIntegerField()
+    requested = models.DateTimeField('Дата запроса', auto_now_add=True)
+    deleted_objects = models.PositiveIntegerField(
+        'Удалено записей',
+        default=0
+    )
+
+    class Meta:
+        ordering = ('requested',)
+        unique_together = ('content_type', 'object_id')
+        verbose_name = 'Отложенное удаление'
+        verbose_name_plural = 'Отложенные удаления'
+
+    def __str__(self):
+        return f'{self.content_type} #{self.object_id}'
+
+
+class TrendingBucket(models.Model):
+    """Число событий объекта за одну временную корзину."""
+    kind = models.CharField(max_length=10)
+    object_id = models.BigIntegerField()
+    bucket = models.PositiveIntegerField(db_index=True)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('kind', 'object_id', 'bucket')
+
+
+class TrendingList(models.Model):
+    """Готовый список популярного в JSON, пересчитанный фоновой задачей.
+
+    Хранится в базе, а не только в кэше: задача и веб-процессы могут
+    не делить кэш.
+    """
+    kind = models.CharField(max_length=10, primary_key=True)
+    items = models.TextField(default='[]')
+    updated = models.DateTimeField(auto_now=True)
+
+
+class Tag(models.Model):
+    name = models.CharField('Хэштег', max_length=100, unique=True)
+
+    class Meta:
+        ordering = ('name',)
+        verbose_name = 'Хэштег'
+        verbose_name_plural = 'Хэштеги'
+
+    def __str__(self):
+        return self.name
+
+
+class PostTag(models.Model):
+    """Запись инвертированного индекса: пост с хэштегом.
+
+    Хранится id поста, а не внешний ключ: пост может лежать в другом
+    шарде или в архиве. Дата копируется из поста ради индекса ленты.
+    """
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        related_name='entries',
+    )
+    post_id = models.BigIntegerField()
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('tag', 'post_id')
+        indexes = [
+            models.Index(
+                fields=('tag', '-pub_date', '-post_id'),
+                name='posttag_feed_idx',
+            ),
+        ]
+
+
+class Mention(models.Model):
+    """Запись инвертированного индекса: пост, упоминающий пользователя."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='mentions',
+    )
+    post_id = models.BigIntegerField()
+    pub_date = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('user', 'post_id')
+        indexes = [
+            models.Index(
+                fields=('user', '-pub_date', '-post_id'),
+                name='mention_feed_idx',
+            ),
+        ]
+
+
+class NotificationEvent(models.Model):
+    """Событие для уведомления: одна короткая строка в журнале.
+
+    object_id — id подписчика для подписки и id поста для комментария.
+    Журнал разбирает команда send_digests и удаляет обработанное.
+    """
+    FOLLOW = 1
+    COMMENT = 2
+    KINDS = (
+        (FOLLOW, 'Подписка'),
+        (COMMENT, 'Комментарий'),
+    )
+
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+    )
+    kind = models.PositiveSmallIntegerField(choices=KINDS)
+    object_id = models.BigIntegerField()
+
+
+class Digest(models.Model):
+    """Сводка событий пользователя за период между запусками send_digests."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='digests',
+    )
+    created = models.DateTimeField('Дата создания', auto_now_add=True)
+    followers = models.PositiveIntegerField('Новых подписчиков', default=0)
+    comments = models.PositiveIntegerField('Новых комментариев', default=0)
+    commented_posts = models.PositiveIntegerField(
+        'Прокомментированных постов',
+        default=0
+    )
+    is_read = models.BooleanField('Прочитано', default=False)
+
+    class Meta:
+        ordering = ('-created',)
+        verbose_name = 'Сводка уведомлений'
+        verbose_name_plural = 'Сводки уведомлений'
+
+
+class UnreadCounter(models.Model):
+    """Число непрочитанных сводок; шапка читает одну строку по pk."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='unread_counter',
+    )
+    count = models.PositiveIntegerField(default=0)
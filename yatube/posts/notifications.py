@@ -0,0 +1,81 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max
+
+from .models import Digest, NotificationEvent, UnreadCounter
+
+CACHE_KEY = 'unread:{}'
+
+
+def notify(recipient_id, kind, object_id):
+    """Дописывает событие в журнал; сводку соберёт send_digests."""
+    NotificationEvent.objects.create(
+        recipient_id=recipient_id, kind=kind, object_id=object_id
+    )
+
+
+def build_digests():
+    """Сворачивает журнал в сводки: по одной на получателя.
+
+    Журнал агрегируется одним GROUP BY, затем создаются сводки
+    и обновляются счётчики. Возвращает число созданных сводок.
+    """
+    with transaction.atomic():
+        last_pk = NotificationEvent.objects.aggregate(last=Max('pk'))['last']
+        if last_pk is None:
+            return 0
+        events = NotificationEvent.objects.filter(pk__lte=last_pk)
+        digests = defaultdict(dict)
+        rows = events.order_by().values('recipient', 'kind').annotate(
+            total=Count('pk'), objects=Count('object_id', distinct=True)
+        )
+        for row in rows:
+            digest = digests[row['recipient']]
+            if row['kind'] == NotificationEvent.FOLLOW:
+                digest['followers'] = row['objects']
+            else:
+                digest['comments'] = row['total']
+                digest['commented_posts'] = row['objects']
+        Digest.objects.bulk_create([
+            Digest(user_id=user_id, **counts)
+            for user_id, counts in digests.items()
+        ])
+        for user_id in digests:
+            _increment(user_id)
+        events.delete()
+    cache.delete_many([CACHE_KEY.format(user_id) for user_id in digests])
+    return len(digests)
+
+
+def _increment(user_id):
+    counters = UnreadCounter.objects.filter(user_id=user_id)
+    if counters.update(count=F('count') + 1):
+        return
+    try:
+        with transaction.atomic():
+            counters.create(user_id=user_id, count=1)
+    except IntegrityError:
+        counters.update(count=F('count') + 1)
+
+
+def unread_count(user_id):
+    """Непрочитанные сводки из кэша; при промахе — одна строка по pk."""
+    key = CACHE_KEY.format(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = UnreadCounter.objects.filter(user_id=user_id).values_list(
+            'count', flat=True
+        ).first() or 0
+        cache.set(key, count, settings.NOTIFICATIONS_CACHE_SECONDS)
+    return count
+
+
+def mark_read(user_id):
+    Digest.objects.filter(user_id=user_id, is_read=False).update(is_read=True)
+    UnreadCounter.objects.filter(user_id=user_id).update(count=0)
+    cache.set(
+        CACHE_KEY.format(user_id), 0, settings.NOTIFICATIONS_CACHE_SECONDS
+    )
@@ -0,0 +1,48 @@
+from django.urls import NoReverseMatch, reverse
+
+from core.middleware.pagecache import purge_pages
+from .models import Group, User
+
+
+def group_pages(*slugs):
+    """Адреса групп; у слага, не подходящего под URL, страницы нет."""
+    paths = []
+    for slug in slugs:
+        try:
+            paths.append(reverse('posts:group_list', args=(slug,)))
+        except NoReverseMatch:
+            pass
+    return paths
+
+
+def post_changed(post, group_ids=()):
+    """Сбрасывает закэшированные страницы, на которых виден пост."""
+    posts_changed([post.pk], [post.author_id], group_ids)
+
+
+def posts_changed(post_ids, author_ids, group_ids=()):
+    """То же для многих постов: одна запись поколений в кэш."""
+    usernames = User.objects.filter(pk__in=author_ids).values_list(
+        'username', flat=True
+    )
+    slugs = Group.objects.filter(
+        pk__in=[pk for pk in group_ids if pk]
+    ).values_list('slug', flat=True)
+    purge_pages(
+        reverse('posts:index'),
+        *(reverse('posts:post_detail', args=(pk,)) for pk in post_ids),
+        *(reverse('posts:profile', args=(name,)) for name in usernames),
+        *group_pages(*slugs),
+    )
+
+
+def comment_changed(post_id):
+    purge_pages(reverse('posts:post_detail', args=(post_id,)))
+
+
+def author_changed(author_id):
+    username = User.objects.filter(pk=author_id).values_list(
+        'username', flat=True
+    ).first()
+    if username:
+        purge_pages(reverse('posts:profile', args=(username,)))
@@ -0,0 +1,198 @@
+import heapq
+import random
+import time
+from itertools import islice
+from zlib import crc32
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import models
+from django.db.models import Max
+
+SHARDED_MODELS = ('posts.post', 'posts.comment')
+
+
+def is_sharded():
+    return len(settings.POST_SHARDS) > 1
+
+
+def shard_for_author(author_id):
+    """Шард автора: все его посты лежат в одной базе."""
+    shards = settings.POST_SHARDS
+    return shards[crc32(str(author_id).encode()) % len(shards)]
+
+
+def new_post_id():
+    """Глобально уникальный id поста: миллисекунды и случайные биты.
+
+    Автоинкремент у каждого шарда свой, поэтому id выдаются заранее,
+    чтобы посты разных шардов не совпадали по pk.
+    """
+    return (int(time.time() * 1000) << 16) | random.getrandbits(16)
+
+
+MAX_POST_ID_KEY = 'post_max_id'
+
+
+def max_post_id():
+    """Наибольший id поста во всех шардах и архиве, из кэша.
+
+    Запросы к несуществующим постам с большими id отсекаются по нему
+    без чтения базы.
+    """
+    value = cache.get(MAX_POST_ID_KEY)
+    if value is None:
+        from .models import ArchivedPost, Post
+
+        querysets = [
+            Post.objects.using(alias) for alias in settings.POST_SHARDS
+        ]
+        querysets.append(ArchivedPost.objects.all())
+        value = max(
+            queryset.aggregate(value=Max('pk'))['value'] or 0
+            for queryset in querysets
+        )
+        cache.set(MAX_POST_ID_KEY, value, settings.POST_MAX_ID_SECONDS)
+    return value
+
+
+def forget_max_post_id():
+    cache.delete(MAX_POST_ID_KEY)
+
+
+def _location_key(post_id):
+    return f'post_shard:{post_id}'
+
+
+def remember_location(post_id, alias):
+    cache.set(_location_key(post_id), alias, settings.SHARD_LOCATION_TIMEOUT)
+
+
+def locate_post(post_id):
+    """Шард, в котором лежит пост, или None."""
+    alias = cache.get(_location_key(post_id))
+    if alias is not None:
+        return alias
+    from .models import Post
+
+    for alias in settings.POST_SHARDS:
+        if Post.objects.using(alias).filter(pk=post_id).exists():
+            remember_location(post_id, alias)
+            return alias
+    return None
+
+
+class MergedFeed:
+    """Лента из всех шардов, упорядоченная по дате публикации.
+
+    Поддерживает count() и срезы, поэтому её можно отдать Paginator.
+    Для страницы N с каждого шарда читается N * размер страницы строк.
+    """
+
+    def __init__(self, querysets):
+        self.querysets = querysets
+
+    def count(self):
+        return sum(queryset.count() for queryset in self.querysets)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        start, stop = key.start or 0, key.stop
+        merged = heapq.merge(
+            *(queryset[:stop] for queryset in self.querysets),
+            key=lambda post: (post.pub_date, post.pk),
+            reverse=True,
+        )
+        return list(islice(merged, start, stop))
+
+
+class ShardedPostManager(models.Manager):
+    """Менеджер постов, знающий, в каком шарде искать."""
+
+    def for_author(self, author):
+        if not is_sharded():
+            return self.filter(author=author)
+        return self.using(shard_for_author(author.pk)).filter(author=author)
+
+    def locate(self, post_id):
+        if not is_sharded():
+            return self.all()
+        return self.using(locate_post(post_id) or 'default')
+
+    def feed(self, **filters):
+        if not is_sharded():
+            return self.filter(**filters)
+        filters = {
+            name: list(value) if isinstance(value, models.QuerySet) else value
+            for name, value in filters.items()
+        }
+        return MergedFeed([
+            self.using(alias).filter(**filters)
+            for alias in settings.POST_SHARDS
+        ])
+
+
+class ShardRouter:
+    """Посты и комментарии автора лежат в шарде, выбранном по author_id.
+
+    Комментарии хранятся рядом со своим постом, поэтому страница поста
+    читает один шард.
+    """
+
+    def _shard(self, model, **hints):
+        if not is_sharded() or model._meta.label_lower not in SHARDED_MODELS:
+            return None
+        instance = hints.get('instance')
+        if instance is None:
+            return None
+        # У нового объекта _state.db проставлен при присваивании автора
+        # или группы и указывает на их базу, а не на шард: шард считается
+        # заново.
+        if isinstance(instance, model) and instance._state.adding:
+            if model._meta.model_name == 'post':
+                if instance.author_id is None:
+                    return None
+                return shard_for_author(instance.author_id)
+            if instance.post_id is None:
+                return None
+            return locate_post(instance.post_id)
+        return instance._state.db or None
+
+    db_for_read = _shard
+    db_for_write = _shard
+
+    def allow_relation(self, obj1, obj2, **hints):
+        if is_sharded():
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        """Шарды получают полную схему: посты ссылаются на auth и группы."""
+        if db in settings.POST_SHARDS:
+            return True
+        return None
+
+
+def mirror_to_shards(sender, instance, raw=False, using='default', **kwargs):
+    """Копирует пользователей и группы во все шарды ради внешних ключей."""
+    if raw or using != 'default' or not is_sharded():
+        return
+    for alias in settings.POST_SHARDS:
+        if alias != 'default':
+            sender.objects.using(alias).update_or_create(
+                pk=instance.pk,
+                defaults={
+                    field.attname: getattr(instance, field.attname)
+                    for field in sender._meta.concrete_fields
+                    if not field.primary_key
+                },
+            )
+
+
+def track_location(sender, instance, created, using='default', **kwargs):
+    if created and is_sharded():
+        remember_location(instance.pk, using)
@@ -0,0 +1,232 @@
+import threading
+from contextlib import contextmanager
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from core.entities import entity_created, forget
+from core.markup import render_cached
+from core.middleware.pagecache import page_cache_hit, purge_pages
+from core.paginator import invalidate_counts
+
+from . import (
+    counts, duplicates, notifications, pages, stats, tags, trending,
+    view_counts
+)
+from .models import (
+    Comment, Follow, Group, GroupStats, NotificationEvent, Post, User
+)
+from .sharding import forget_max_post_id
+
+_state = threading.local()
+
+# Поле, по которому views ищут объект через core.entities.
+ENTITY_FIELDS = {User: 'username', Group: 'slug'}
+
+
+@contextmanager
+def muted():
+    """Отключает обработчики на время массовых операций.
+
+    Вызывающий код сам обновляет счётчики и кэши одним действием.
+    """
+    previous = getattr(_state, 'muted', False)
+    _state.muted = True
+    try:
+        yield
+    finally:
+        _state.muted = previous
+
+
+def is_muted():
+    return getattr(_state, 'muted', False)
+
+
+@receiver(post_save, sender=Group)
+def create_group_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        GroupStats.objects.get_or_create(group=instance)
+        # pk мог достаться от удалённой группы вместе с её счётчиком.
+        invalidate_counts(counts.GROUPS, counts.group_scope(instance.pk))
+
+
+@receiver(post_save, sender=User)
+def reset_user_counts(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        invalidate_counts(
+            counts.author_scope(instance.pk), counts.follow_scope(instance.pk)
+        )
+
+
+@receiver(post_delete, sender=Group)
+def forget_group_count(sender, instance, **kwargs):
+    invalidate_counts(counts.GROUPS, counts.group_scope(instance.pk))
+
+
+@receiver(pre_save, sender=User)
+@receiver(pre_save, sender=Group)
+def remember_old_lookup(sender, instance, raw=False, update_fields=None,
+                        **kwargs):
+    field = ENTITY_FIELDS[sender]
+    if raw or instance._state.adding or (
+        update_fields and field not in update_fields
+    ):
+        return
+    instance._old_lookup = (
+        sender.objects.filter(pk=instance.pk)
+        .values_list(field, flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=Group)
+def forget_entity(sender, instance, created=False, **kwargs):
+    field = ENTITY_FIELDS[sender]
+    value = getattr(instance, field)
+    old_value = getattr(instance, '_old_lookup', None)
+    forget(sender, field, *{value, old_value or value})
+    if created or (old_value and old_value != value):
+        entity_created(sender, field, value)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def forget_post(sender, instance, created=False, **kwargs):
+    if not is_muted():
+        forget(Post, 'pk', instance.pk)
+    if created:
+        forget_max_post_id()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def purge_group_page(sender, instance, raw=False, **kwargs):
+    if not raw:
+        purge_pages(*pages.group_pages(instance.slug))
+
+
+@receiver(pre_save, sender=Post)
+@receiver(pre_save, sender=Comment)
+def render_text(sender, instance, raw=False, **kwargs):
+    if not raw:
+        instance.text_html = render_cached(instance.text)
+
+
+@receiver(pre_save, sender=Post)
+def remember_old_group(sender, instance, raw=False, **kwargs):
+    if raw or is_muted() or instance._state.adding:
+        return
+    instance._old_group_id = (
+        Post.objects.using(instance._state.db)
+        .filter(pk=instance.pk)
+        .values_list('group_id', flat=True)
+        .first()
+    )
+
+
+@receiver(post_save, sender=Post)
+def update_stats_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw or is_muted():
+        return
+    if created:
+        duplicates.remember(instance.text)
+        trending.record(trending.GROUP, instance.group_id)
+        counts.post_changed(instance.author_id, [instance.group_id])
+        if instance.group_id:
+            stats.post_added(instance.group_id, instance.pub_date)
+        return
+    old_group_id = getattr(instance, '_old_group_id', None)
+    if old_group_id != instance.group_id:
+        group_ids = [pk for pk in (old_group_id, instance.group_id) if pk]
+        invalidate_counts(*map(counts.group_scope, group_ids))
+        stats.refresh_stats(group_ids)
+
+
+@receiver(post_save, sender=Post)
+def purge_post_pages(sender, instance, raw=False, **kwargs):
+    if raw or is_muted():
+        return
+    pages.post_changed(
+        instance,
+        [instance.group_id, getattr(instance, '_old_group_id', None)],
+    )
+
+
+@receiver(post_delete, sender=Post)
+def purge_deleted_post_pages(sender, instance, **kwargs):
+    if not is_muted():
+        pages.post_changed(instance, [instance.group_id])
+
+
+@receiver(post_save, sender=Post)
+def index_tags(sender, instance, raw=False, **kwargs):
+    if not raw and not is_muted():
+        tags.reindex_post(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_tags(sender, instance, **kwargs):
+    if not is_muted():
+        tags.unindex_post(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def update_stats_on_delete(sender, instance, **kwargs):
+    if is_muted():
+        return
+    counts.post_changed(instance.author_id, [instance.group_id])
+    if instance.group_id:
+        stats.post_removed(instance.group_id, instance.pub_date)
+
+
+@receiver(post_save, sender=Comment)
+def record_comment_activity(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and not is_muted():
+        duplicates.remember(instance.text)
+        trending.record(trending.POST, instance.post_id)
+        trending.record(trending.GROUP, instance.post.group_id)
+        if instance.author_id != instance.post.author_id:
+            notifications.notify(
+                instance.post.author_id,
+                NotificationEvent.COMMENT,
+                instance.post_id,
+            )
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def purge_comment_pages(sender, instance, raw=False, **kwargs):
+    if not raw and not is_muted():
+        pages.comment_changed(instance.post_id)
+
+
+@receiver(post_save, sender=Follow)
+def notify_author_on_follow(sender, instance, created, raw=False, **kwargs):
+    if created and not raw and not is_muted():
+        notifications.notify(
+            instance.author_id, NotificationEvent.FOLLOW, instance.user_id
+        )
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def reset_follow_count(sender, instance, **kwargs):
+    if not is_muted():
+        invalidate_counts(counts.follow_scope(instance.user_id))
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def purge_follow_pages(sender, instance, raw=False, **kwargs):
+    if not raw and not is_muted():
+        pages.author_changed(instance.author_id)
+
+
+@receiver(page_cache_hit)
+def count_cached_view(sender, view_name, view_kwargs, **kwargs):
+    """Страница поста из кэша тоже учитывается в просмотрах."""
+    if view_name == 'posts:post_detail':
+        view_counts.record_view_id(view_kwargs['post_id'])
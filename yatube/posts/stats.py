@@ -0,0 +1,93 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Count, F, Max, Q
+from django.utils import timezone
+
+from .models import ArchivedPost, Group, GroupStats, Post
+
+WEEK = timedelta(days=7)
+
+
+def post_added(group_id, pub_date):
+    """Учитывает новый пост группы одним UPDATE."""
+    updated = GroupStats.objects.filter(group_id=group_id).update(
+        post_count=F('post_count') + 1,
+        week_post_count=F('week_post_count') + 1,
+        last_post_at=pub_date,
+    )
+    if not updated:
+        refresh_stats([group_id])
+
+
+def post_removed(group_id, pub_date):
+    """Вычитает удалённый пост; дату последнего поста считает заново."""
+    stats = GroupStats.objects.filter(group_id=group_id)
+    stats.filter(post_count__gt=0).update(post_count=F('post_count') - 1)
+    if pub_date >= timezone.now() - WEEK:
+        stats.filter(week_post_count__gt=0).update(
+            week_post_count=F('week_post_count') - 1
+        )
+    stats.update(last_post_at=_last_post_at(group_id))
+
+
+def _post_querysets():
+    """Посты всех шардов и архив: статистика группы считается по всем."""
+    querysets = [Post.objects.using(alias) for alias in settings.POST_SHARDS]
+    querysets.append(ArchivedPost.objects.all())
+    return querysets
+
+
+def _last_post_at(group_id):
+    dates = [
+        queryset.filter(group_id=group_id).aggregate(
+            last=Max('pub_date')
+        )['last']
+        for queryset in _post_querysets()
+    ]
+    return max((date for date in dates if date is not None), default=None)
+
+
+def refresh_stats(group_ids=None):
+    """Пересчитывает статистику групп целиком.
+
+    Без аргументов обходит все группы, что нужно раз в сутки, чтобы посты
+    старше недели выпали из week_post_count. Посты считаются в каждом
+    шарде из POST_SHARDS и в архиве, суммы складываются.
+    """
+    groups = Group.objects.all()
+    if group_ids is not None:
+        groups = groups.filter(pk__in=group_ids)
+    totals = {pk: [0, 0, None] for pk in groups.values_list('pk', flat=True)}
+    week_ago = timezone.now() - WEEK
+    for queryset in _post_querysets():
+        queryset = queryset.filter(group__isnull=False)
+        if group_ids is not None:
+            queryset = queryset.filter(group_id__in=list(totals))
+        rows = (
+            queryset.order_by()
+            .values('group')
+            .annotate(
+                total=Count('pk'),
+                week=Count('pk', filter=Q(pub_date__gte=week_ago)),
+                last=Max('pub_date'),
+            )
+            .values_list('group', 'total', 'week', 'last')
+        )
+        for group_id, total, week, last in rows:
+            entry = totals.get(group_id)
+            if entry is None:
+                continue
+            entry[0] += total
+            entry[1] += week
+            if last is not None and (entry[2] is None or last > entry[2]):
+                entry[2] = last
+    for group_id, (total, week, last) in totals.items():
+        GroupStats.objects.update_or_create(
+            group_id=group_id,
+            defaults={
+                'post_count': total,
+                'week_post_count': week,
+                'last_post_at': last,
+            },
+        )
@@ -0,0 +1,68 @@
+from django.conf import settings
+
+from core.markup import hashtags, mentions
+from .models import ArchivedPost, Mention, Post, PostTag, Tag, User
+
+
+def index_posts(rows):
+    """Добавляет в индекс пачку постов [(pk, text, pub_date), ...].
+
+    На всю пачку уходит постоянное число запросов: хэштеги создаются
+    одним bulk_create, записи индекса — ещё двумя.
+    """
+    tags = {}
+    names = {}
+    for pk, text, pub_date in rows:
+        tags[pk, pub_date] = hashtags(text)
+        names[pk, pub_date] = mentions(text)
+    all_tags = set().union(*tags.values())
+    if all_tags:
+        Tag.objects.bulk_create(
+            [Tag(name=name) for name in all_tags], ignore_conflicts=True
+        )
+    tag_ids = dict(
+        Tag.objects.filter(name__in=all_tags).values_list('name', 'pk')
+    )
+    user_ids = dict(
+        User.objects.filter(
+            username__in=set().union(*names.values())
+        ).values_list('username', 'pk')
+    )
+    PostTag.objects.bulk_create([
+        PostTag(tag_id=tag_ids[name], post_id=pk, pub_date=pub_date)
+        for (pk, pub_date), post_tags in tags.items()
+        for name in post_tags
+    ], ignore_conflicts=True)
+    Mention.objects.bulk_create([
+        Mention(user_id=user_ids[name], post_id=pk, pub_date=pub_date)
+        for (pk, pub_date), usernames in names.items()
+        for name in usernames if name in user_ids
+    ], ignore_conflicts=True)
+
+
+def unindex_post(post_id):
+    PostTag.objects.filter(post_id=post_id).delete()
+    Mention.objects.filter(post_id=post_id).delete()
+
+
+def reindex_post(post):
+    unindex_post(post.pk)
+    index_posts([(post.pk, post.text, post.pub_date)])
+
+
+def load_posts(ids):
+    """Посты по списку id в том же порядке: из шардов, затем из архива."""
+    found = {}
+    for alias in settings.POST_SHARDS:
+        found.update(
+            Post.objects.using(alias)
+            .select_related('author', 'group')
+            .in_bulk(ids)
+        )
+    missing = set(ids) - set(found)
+    if missing:
+        found.update(
+            ArchivedPost.objects.select_related('author', 'group')
+            .in_bulk(missing)
+        )
+    return [found[pk] for pk in ids if pk in found]
@@ -0,0 +1,60 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from yatube.settings import NUM_OF_POSTS
+from ..models import ArchivedComment, ArchivedPost, Comment, Post, User
+
+
+class ArchiveTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='Archivist')
+        Post.objects.bulk_create([
+            Post(text=f'Свежий пост {i}', author=cls.user)
+            for i in range(NUM_OF_POSTS)
+        ])
+        cls.old_post = Post.objects.create(
+            text='Старый пост', author=cls.user
+        )
+        Comment.objects.create(
+            post=cls.old_post, author=cls.user, text='Старый комментарий'
+        )
+        Post.objects.filter(pk=cls.old_post.pk).update(
+            pub_date=timezone.now() - timedelta(days=365)
+        )
+
+    def setUp(self):
+        self.guest_client = Client()
+        call_command('archive_posts', days=30, stdout=StringIO())
+
+    def test_old_posts_moved_to_archive(self):
+        """Старые посты и их комментарии переезжают в архив."""
+        self.assertFalse(Post.objects.filter(pk=self.old_post.pk).exists())
+        self.assertEqual(Post.objects.count(), NUM_OF_POSTS)
+        self.assertTrue(
+            ArchivedPost.objects.filter(pk=self.old_post.pk).exists()
+        )
+        self.assertEqual(
+            ArchivedComment.objects.get().text, 'Старый комментарий'
+        )
+
+    def test_post_detail_reads_archive(self):
+        """Страница архивного поста открывается по старому адресу."""
+        response = self.guest_client.get(
+            reverse('posts:post_detail', kwargs={'post_id': self.old_post.pk})
+        )
+        self.assertContains(response, 'Старый комментарий')
+
+    def test_deep_page_reads_archive(self):
+        """Архивные посты продолжают ленту после горячих."""
+        response = self.guest_client.get(reverse('posts:index') + '?page=2')
+        self.assertEqual(
+            [post.pk for post in response.context['page_obj']],
+            [self.old_post.pk],
+        )
@@ -0,0 +1,120 @@
+from io import StringIO
+
+from django.contrib.admin import helpers
+from django.contrib.auth.models import Permission
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Comment, Group, GroupStats, Post, PostTag, User
+
+
+class BulkPostsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Группа', slug='source', description='Описание'
+        )
+        cls.target = Group.objects.create(
+            title='Другая', slug='target', description='Описание'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.posts = [
+            Post.objects.create(
+                author=self.author, group=self.group, text=f'Пост {i} #тег'
+            )
+            for i in range(5)
+        ]
+        self.foreign = Post.objects.create(
+            author=self.other, group=self.group, text='Чужой пост'
+        )
+
+    def call(self, *args):
+        out = StringIO()
+        call_command('bulk_posts', *args, '--batch-size=2', '--pause=0',
+                     stdout=out)
+        return out.getvalue()
+
+    def post_count(self, group):
+        return GroupStats.objects.get(group=group).post_count
+
+    def test_move_updates_stats_and_feeds(self):
+        url = reverse('posts:group_list', args=(self.target.slug,))
+        page = self.client.get(url).context['page_obj']
+        self.assertEqual(page.paginator.count, 0)
+        output = self.call(
+            'move', '--group=source', '--author=author', '--to=target'
+        )
+        self.assertIn('Перенесено постов: 5', output)
+        self.assertEqual(Post.objects.filter(group=self.target).count(), 5)
+        self.assertEqual(self.post_count(self.group), 1)
+        self.assertEqual(self.post_count(self.target), 5)
+        page = self.client.get(url).context['page_obj']
+        self.assertEqual(page.paginator.count, 5)
+
+    def test_clear_group(self):
+        self.call('clear', '--group=source')
+        self.assertFalse(Post.objects.filter(group__isnull=False).exists())
+        self.assertEqual(self.post_count(self.group), 0)
+
+    def test_delete_removes_dependents(self):
+        Comment.objects.create(
+            post=self.posts[0], author=self.other, text='Комментарий'
+        )
+        detail = reverse('posts:post_detail', args=(self.posts[0].pk,))
+        self.assertEqual(self.client.get(detail).status_code, 200)
+        output = self.call('delete', '--author=author')
+        self.assertIn('Удалено постов: 5', output)
+        self.assertEqual(list(Post.objects.all()), [self.foreign])
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(PostTag.objects.exists())
+        self.assertEqual(self.post_count(self.group), 1)
+        self.assertEqual(self.client.get(detail).status_code, 404)
+
+    def test_filter_required(self):
+        with self.assertRaises(CommandError):
+            self.call('delete')
+        with self.assertRaises(CommandError):
+            self.call('move', '--group=source')
+
+    def test_admin_move_action(self):
+        admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        self.client.force_login(admin)
+        url = reverse('admin:posts_post_changelist')
+        data = {
+            'action': 'move_to_group',
+            helpers.ACTION_CHECKBOX_NAME: [self.posts[0].pk, self.foreign.pk],
+        }
+        response = self.client.post(url, data)
+        self.assertTemplateUsed(
+            response, 'admin/posts/post/move_to_group.html'
+        )
+        self.client.post(url, {**data, 'apply': '1', 'group': self.target.pk})
+        self.assertEqual(
+            set(Post.objects.filter(group=self.target)),
+            {self.posts[0], self.foreign},
+        )
+        self.assertEqual(self.post_count(self.target), 2)
+
+    def test_admin_actions_need_permissions(self):
+        """Сотрудник с правом только на просмотр не запускает действия."""
+        staff = User.objects.create_user(username='viewer', is_staff=True)
+        staff.user_permissions.add(
+            Permission.objects.get(codename='view_post')
+        )
+        self.client.force_login(staff)
+        url = reverse('admin:posts_post_changelist')
+        for action in ('move_to_group', 'clear_group', 'delete_in_batches'):
+            self.client.post(url, {
+                'action': action,
+                helpers.ACTION_CHECKBOX_NAME: [self.posts[0].pk],
+            })
+        self.posts[0].refresh_from_db()
+        self.assertEqual(self.posts[0].group, self.group)
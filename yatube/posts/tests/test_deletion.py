@@ -0,0 +1,115 @@
+from io import StringIO
+
+from django.contrib.admin import helpers
+from django.contrib.auth.models import Permission
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..deletion import dependents, schedule_deletion
+from ..models import (Comment, Digest, Follow, Group, Mention,
+                      NotificationEvent, PendingDeletion, Post, User)
+from .test_sharding import TwoShardsTestCase
+
+
+class DeferredDeletionTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create(username='Prolific')
+        cls.reader = User.objects.create(username='Reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='deletion-group', description='Описание'
+        )
+        for i in range(5):
+            post = Post.objects.create(
+                author=cls.author, group=cls.group, text=f'Пост {i}'
+            )
+            Comment.objects.create(post=post, author=cls.reader, text='Ок')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def process(self):
+        call_command(
+            'process_deletions', batch_size=2, pause=0, stdout=StringIO()
+        )
+
+    def test_user_is_deleted_in_batches(self):
+        """Пользователь и все его записи удаляются командой."""
+        schedule_deletion(self.author)
+        self.author.refresh_from_db()
+        self.assertFalse(self.author.is_active)
+        self.assertTrue(Post.objects.filter(author=self.author).exists())
+
+        self.process()
+        self.assertFalse(User.objects.filter(pk=self.author.pk).exists())
+        self.assertFalse(Post.objects.exists())
+        self.assertFalse(Comment.objects.exists())
+        self.assertFalse(Follow.objects.exists())
+        self.assertFalse(PendingDeletion.objects.exists())
+
+    def test_user_dependents_found_through_relations(self):
+        """В пачках удаляются и модели, не перечисленные вручную."""
+        models = {queryset.model for queryset in dependents(self.author)}
+        self.assertLessEqual(
+            {Comment, Post, Follow, Mention, NotificationEvent, Digest},
+            models,
+        )
+
+    def test_admin_action_needs_delete_permission(self):
+        """Сотрудник с правом только на просмотр не удаляет пользователей."""
+        staff = User.objects.create_user(username='viewer', is_staff=True)
+        staff.user_permissions.add(
+            Permission.objects.get(codename='view_user')
+        )
+        self.client.force_login(staff)
+        self.client.post(reverse('admin:auth_user_changelist'), {
+            'action': 'delete_in_background',
+            helpers.ACTION_CHECKBOX_NAME: [self.author.pk],
+        })
+        self.author.refresh_from_db()
+        self.assertTrue(self.author.is_active)
+        self.assertFalse(PendingDeletion.objects.exists())
+
+    def test_group_posts_are_unlinked(self):
+        """При удалении группы посты остаются без группы."""
+        schedule_deletion(self.group)
+        self.process()
+        self.assertFalse(Group.objects.exists())
+        self.assertEqual(Post.objects.filter(group=None).count(), 5)
+
+
+class ShardedGroupDeletionTest(TwoShardsTestCase):
+    def test_group_posts_unlinked_in_every_shard(self):
+        """Посты группы отвязываются во всех шардах, а не только в default."""
+        group = Group.objects.create(
+            title='Группа', slug='sharded-group', description='Описание'
+        )
+        for alias in ('default', 'shard1'):
+            author = User.objects.using(alias).create(username=f'By{alias}')
+            Post.objects.using(alias).create(
+                author=author, group=group, text=f'Пост в {alias}'
+            )
+        schedule_deletion(group)
+        call_command(
+            'process_deletions', batch_size=1, pause=0, stdout=StringIO()
+        )
+        for alias in ('default', 'shard1'):
+            self.assertFalse(
+                Post.objects.using(alias).filter(group__isnull=False).exists()
+            )
+            self.assertEqual(Post.objects.using(alias).count(), 1)
+
+    def test_post_in_other_shard_is_deleted(self):
+        """Пост из другого шарда удаляется вместе с комментарием."""
+        author = User.objects.create(username='ShardAuthor')
+        post = Post.objects.using('shard1').create(author=author, text='Пост')
+        Comment.objects.using('shard1').create(
+            post=post, author=author, text='Комментарий'
+        )
+        schedule_deletion(post)
+        call_command(
+            'process_deletions', batch_size=1, pause=0, stdout=StringIO()
+        )
+        self.assertFalse(Post.objects.using('shard1').exists())
+        self.assertFalse(Comment.objects.using('shard1').exists())
+        self.assertFalse(PendingDeletion.objects.exists())
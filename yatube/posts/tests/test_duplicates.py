@@ -0,0 +1,27 @@
+from django.test import TransactionTestCase
+
+from .. import duplicates
+from ..models import Post, User
+from ..signals import muted
+
+TEXT = 'Заходите на мой канал там много интересного для всех'
+
+
+class WarmUpTest(TransactionTestCase):
+    def setUp(self):
+        # Дожидаемся загрузки, запущенной другими тестами.
+        with duplicates._loading:
+            pass
+        duplicates.index.clear()
+        duplicates._warm.clear()
+        self.addCleanup(duplicates.index.clear)
+        with muted():
+            Post.objects.create(
+                author=User.objects.create(username='Spammer'), text=TEXT
+            )
+
+    def test_warm_up_loads_in_background(self):
+        """Флаг ставится только после загрузки старых текстов."""
+        duplicates.warm_up()
+        self.assertTrue(duplicates._warm.wait(2))
+        self.assertTrue(duplicates.is_duplicate(TEXT))
@@ -127,3 +127,37 @@ class PostCreateFormTests(TestCase):
         )
         self.assertEqual(response.status_code, HTTPStatus.OK)
         self.assertEqual(Comment.objects.count(), coment_count + 1)
+
+    def test_duplicate_comment_rejected(self):
+        '''Почти повторный комментарий не сохраняется'''
+        post = Post.objects.create(author=self.user, text='Текст')
+        url = reverse('posts:add_comment', kwargs={'post_id': post.pk})
+        text = 'Заходите на мой канал там много интересного для всех'
+        self.authorized_client.post(url, data={'text': text})
+        self.authorized_client.post(url, data={'text': text + '!!'})
+        self.assertEqual(Comment.objects.filter(post=post).count(), 1)
+
+    def test_ajax_comment_returns_fragment(self):
+        '''Комментарий через fetch возвращает только его HTML'''
+        post = Post.objects.create(author=self.user, text='Текст')
+        url = reverse('posts:add_comment', kwargs={'post_id': post.pk})
+        response = self.authorized_client.post(
+            url,
+            data={'text': 'Комментарий без перезагрузки'},
+            HTTP_X_REQUESTED_WITH='XMLHttpRequest',
+        )
+        self.assertEqual(response.status_code, HTTPStatus.CREATED)
+        self.assertTemplateUsed(response, 'posts/includes/comment.html')
+        self.assertContains(
+            response, 'Комментарий без перезагрузки',
+            status_code=HTTPStatus.CREATED,
+        )
+        self.assertNotContains(
+            response, '<html', status_code=HTTPStatus.CREATED
+        )
+        response = self.authorized_client.post(
+            url, data={'text': ''}, HTTP_X_REQUESTED_WITH='XMLHttpRequest'
+        )
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+        self.assertIn('text', response.json()['errors'])
+        self.assertEqual(Comment.objects.filter(post=post).count(), 1)
@@ -0,0 +1,107 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from yatube.settings import NUM_OF_POSTS
+from ..archive import archive_batch
+from ..models import Follow, Group, Post
+
+User = get_user_model()
+
+
+class FeedFragmentTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.posts = [
+            Post.objects.create(
+                author=cls.author, group=cls.group, text=f'Пост {i}'
+            )
+            for i in range(NUM_OF_POSTS + 3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+
+    def test_page_links_fragment(self):
+        """Полная страница отдаёт курсор и адрес подгрузки."""
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(len(response.context['page_obj']), NUM_OF_POSTS)
+        self.assertTrue(response.context['next_cursor'])
+        self.assertContains(response, 'data-url="/feed/"')
+
+    def test_html_fragment_follows_cursor(self):
+        url = reverse('posts:index_feed')
+        response = self.client.get(url)
+        self.assertTemplateUsed(response, 'posts/includes/post_card.html')
+        self.assertNotContains(response, '<html')
+        self.assertContains(response, '<article>', count=NUM_OF_POSTS)
+        response = self.client.get(url, {'after': response['X-Next-Cursor']})
+        self.assertContains(response, '<article>', count=3)
+        self.assertEqual(response['X-Next-Cursor'], '')
+        self.assertIn('public', response['Cache-Control'])
+
+    def test_bad_cursor_rejected(self):
+        response = self.client.get(
+            reverse('posts:index_feed'), {'after': 'garbage'}
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_cache_key_uses_normalized_cursor(self):
+        """Разные записи одного курсора попадают в одну запись кэша."""
+        cursor = self.client.get(reverse('posts:index_feed'))[
+            'X-Next-Cursor'
+        ]
+        micros, pk = cursor.split('_')
+        self.client.get(
+            reverse('posts:index_feed'), {'after': f'+0{micros}_0{pk}'}
+        )
+        self.assertIsNotNone(cache.get(f'fragment:index:html:{cursor}'))
+
+    def test_fragment_continues_into_archive(self):
+        archive_batch(
+            'default', timezone.now() + timedelta(seconds=1), 5
+        )
+        response = self.client.get(
+            reverse('posts:group_feed', args=(self.group.slug,)),
+            {'format': 'json'},
+        )
+        ids = [post['id'] for post in response.json()['posts']]
+        response = self.client.get(
+            reverse('posts:group_feed', args=(self.group.slug,)),
+            {'format': 'json', 'after': response.json()['next']},
+        )
+        ids += [post['id'] for post in response.json()['posts']]
+        self.assertIsNone(response.json()['next'])
+        self.assertEqual(ids, [post.pk for post in reversed(self.posts)])
+
+    def test_json_fragment(self):
+        response = self.client.get(
+            reverse('posts:profile_feed', args=(self.author.username,)),
+            {'format': 'json'},
+        )
+        data = response.json()
+        self.assertEqual(len(data['posts']), NUM_OF_POSTS)
+        self.assertEqual(data['posts'][0]['id'], self.posts[-1].pk)
+        self.assertEqual(data['posts'][0]['group'], self.group.slug)
+        self.assertEqual(data['next'], response['X-Next-Cursor'])
+
+    def test_follow_fragment_is_private(self):
+        url = reverse('posts:follow_feed')
+        response = self.client.get(url)
+        self.assertRedirects(
+            response, f'{reverse("users:login")}?next={url}'
+        )
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.client.force_login(self.reader)
+        response = self.client.get(url)
+        self.assertContains(response, '<article>', count=NUM_OF_POSTS)
+        self.assertIn('private', response['Cache-Control'])
@@ -0,0 +1,81 @@
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from sorl.thumbnail import get_thumbnail
+
+from ..models import Post, User
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
+
+class GarbageCollectMediaTest(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.storage = Post._meta.get_field('image').storage
+        user = User.objects.create_user(username='author')
+        self.post = Post.objects.create(
+            author=user,
+            text='С картинкой',
+            image=SimpleUploadedFile('small.gif', SMALL_GIF),
+        )
+        # Своё содержимое в каждом тесте: kvstore sorl помнит миниатюры
+        # по имени файла, а имя зависит только от содержимого.
+        edited = Post.objects.create(
+            author=user,
+            text='Картинку заменили',
+            image=SimpleUploadedFile(
+                'old.gif', SMALL_GIF + self._testMethodName.encode()
+            ),
+        )
+        self.orphan = edited.image.name
+        self.thumbnail = get_thumbnail(edited.image, '10x10')
+        edited.image = ''
+        edited.save()
+        old = time.time() - 2 * 24 * 60 * 60
+        for name in (self.post.image.name, self.orphan):
+            os.utime(self.storage.path(name), (old, old))
+        self.fresh = self.storage.save(
+            'posts/fresh.gif', SimpleUploadedFile('fresh.gif', b'new')
+        )
+
+    def test_dry_run_only_reports(self):
+        out = StringIO()
+        call_command('gc_media', dry_run=True, stdout=out)
+        self.assertIn(self.orphan, out.getvalue())
+        self.assertTrue(self.storage.exists(self.orphan))
+
+    def test_orphans_and_thumbnails_deleted(self):
+        """Удаляются только старые файлы без ссылок и их миниатюры."""
+        self.assertTrue(self.thumbnail.exists())
+        call_command('gc_media', pause=0, stdout=StringIO())
+        self.assertFalse(self.storage.exists(self.orphan))
+        self.assertFalse(self.thumbnail.exists())
+        self.assertTrue(self.storage.exists(self.post.image.name))
+        self.assertTrue(self.storage.exists(self.fresh))
+
+    def test_reuploaded_orphan_kept(self):
+        """Сирота, загруженный заново до сохранения поста, не удаляется."""
+        content = self.storage.open(self.orphan).read()
+        name = self.storage.save(
+            'posts/again.gif', SimpleUploadedFile('again.gif', content)
+        )
+        self.assertEqual(name, self.orphan)
+        call_command('gc_media', pause=0, stdout=StringIO())
+        self.assertTrue(self.storage.exists(self.orphan))
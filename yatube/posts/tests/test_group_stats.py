@@ -0,0 +1,85 @@
+from datetime import timedelta
+from importlib import import_module
+from types import SimpleNamespace
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..archive import archive_batch
+from ..models import Group, GroupStats, Post, User
+
+
+class GroupStatsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='StatsUser')
+        cls.group = Group.objects.create(
+            title='Группа со статистикой',
+            slug='stats-group',
+            description='Описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-stats-group',
+            description='Описание',
+        )
+
+    def stats(self, group):
+        return GroupStats.objects.get(group=group)
+
+    def test_stats_follow_post_changes(self):
+        """Счётчики группы меняются при создании, переносе и удалении."""
+        post = Post.objects.create(
+            author=self.user, group=self.group, text='Пост'
+        )
+        self.assertEqual(self.stats(self.group).post_count, 1)
+        self.assertEqual(self.stats(self.group).week_post_count, 1)
+        self.assertEqual(self.stats(self.group).last_post_at, post.pub_date)
+
+        post.group = self.other_group
+        post.save()
+        self.assertEqual(self.stats(self.group).post_count, 0)
+        self.assertIsNone(self.stats(self.group).last_post_at)
+        self.assertEqual(self.stats(self.other_group).post_count, 1)
+
+        post.delete()
+        self.assertEqual(self.stats(self.other_group).post_count, 0)
+        self.assertEqual(self.stats(self.other_group).week_post_count, 0)
+
+    def test_group_index_lists_groups(self):
+        """Каталог групп показывает группы со статистикой."""
+        cache.clear()
+        Post.objects.create(author=self.user, group=self.group, text='Пост')
+        response = Client().get(reverse('posts:group_index'))
+        self.assertTemplateUsed(response, 'posts/group_index.html')
+        self.assertEqual(response.context['page_obj'][0].group, self.group)
+        self.assertContains(response, 'Всего постов: 1')
+
+    def test_migration_backfill_matches_refresh(self):
+        """Заполнение в миграции считает неделю и архив, как refresh_stats."""
+        old = Post.objects.create(
+            author=self.user, group=self.group, text='Старый пост'
+        )
+        Post.objects.filter(pk=old.pk).update(
+            pub_date=timezone.now() - timedelta(days=30)
+        )
+        archive_batch('default', timezone.now() - timedelta(days=7), 10)
+        new = Post.objects.create(
+            author=self.user, group=self.group, text='Новый пост'
+        )
+        GroupStats.objects.all().delete()
+        migration = import_module('posts.migrations.0007_group_stats')
+        migration.create_group_stats(
+            apps, SimpleNamespace(connection=connection)
+        )
+        stats = self.stats(self.group)
+        self.assertEqual(
+            (stats.post_count, stats.week_post_count, stats.last_post_at),
+            (2, 1, new.pub_date),
+        )
+        self.assertEqual(self.stats(self.other_group).post_count, 0)
@@ -0,0 +1,44 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Comment, Post
+
+User = get_user_model()
+
+
+class RenderedTextTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='**Важно**: https://example.com',
+        )
+
+    def test_text_rendered_on_save(self):
+        """HTML поста и комментария готовится при сохранении."""
+        comment = Comment.objects.create(
+            post=self.post, author=self.user, text='*да*'
+        )
+        self.assertIn('<strong>Важно</strong>', self.post.text_html)
+        self.assertEqual(comment.text_html, '<p><em>да</em></p>')
+
+    def test_pages_show_rendered_text(self):
+        for url in (
+            reverse('posts:index'),
+            reverse('posts:post_detail', args=(self.post.pk,)),
+        ):
+            with self.subTest(url=url):
+                self.assertContains(
+                    self.client.get(url), '<strong>Важно</strong>'
+                )
+
+    def test_rerender_command_updates_stale_html(self):
+        Post.objects.filter(pk=self.post.pk).update(text_html='')
+        call_command('rerender_text', stdout=StringIO())
+        self.post.refresh_from_db()
+        self.assertIn('<strong>Важно</strong>', self.post.text_html)
@@ -0,0 +1,66 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Comment, Digest, Follow, NotificationEvent, Post
+from ..notifications import unread_count
+
+User = get_user_model()
+
+
+class NotificationsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.posts = [
+            Post.objects.create(author=cls.author, text=f'Пост {i}')
+            for i in range(3)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.author)
+
+    def send_digests(self):
+        call_command('send_digests', stdout=StringIO())
+
+    def test_events_folded_into_one_digest(self):
+        """Комментарии и подписка дают одну сводку получателю."""
+        for post in self.posts[:2]:
+            for _ in range(3):
+                Comment.objects.create(
+                    post=post, author=self.reader, text='Отлично'
+                )
+        Comment.objects.create(
+            post=self.posts[2], author=self.author, text='Свой'
+        )
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.send_digests()
+        digest = Digest.objects.get()
+        self.assertEqual(
+            (digest.user, digest.comments, digest.commented_posts,
+             digest.followers),
+            (self.author, 6, 2, 1),
+        )
+        self.assertFalse(NotificationEvent.objects.exists())
+        self.assertEqual(unread_count(self.author.pk), 1)
+
+    def test_post_marks_digests_read(self):
+        """Просмотр не меняет сводки, отметка прочтения — только POST."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        self.send_digests()
+        response = self.client.get(reverse('posts:index'))
+        self.assertEqual(response.context['unread_notifications'], 1)
+        response = self.client.get(reverse('posts:notifications'))
+        self.assertContains(response, 'Отметить прочитанными')
+        self.assertEqual(unread_count(self.author.pk), 1)
+        self.assertFalse(Digest.objects.get().is_read)
+        response = self.client.post(reverse('posts:notifications'))
+        self.assertRedirects(response, reverse('posts:notifications'))
+        self.assertEqual(unread_count(self.author.pk), 0)
+        self.assertTrue(Digest.objects.get().is_read)
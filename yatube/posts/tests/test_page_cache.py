@@ -0,0 +1,83 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .. import view_counts
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+@override_settings(PAGE_CACHE_ENABLED=True)
+class PageCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, group=cls.group, text='Первый пост'
+        )
+
+    def setUp(self):
+        cache.clear()
+        view_counts.views.drain()
+
+    def test_anonymous_page_cached(self):
+        url = reverse('posts:index')
+        response = self.client.get(url)
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+        self.assertIn('Cookie', response['Vary'])
+        response = self.client.get(url)
+        self.assertEqual(response['X-Page-Cache'], 'hit')
+        self.assertContains(response, 'Первый пост')
+        response = self.client.get(url, {'page': 2})
+        self.assertEqual(response['X-Page-Cache'], 'miss')
+
+    def test_session_bypasses_cache(self):
+        url = reverse('posts:index')
+        self.client.get(url)
+        self.client.force_login(self.reader)
+        response = self.client.get(url)
+        self.assertNotIn('X-Page-Cache', response)
+        self.assertContains(response, 'reader')
+
+    def test_other_views_not_cached(self):
+        response = self.client.get(reverse('posts:group_index'))
+        self.assertNotIn('X-Page-Cache', response)
+
+    def test_signals_purge_pages(self):
+        """Новый пост, комментарий и подписка сбрасывают свои страницы."""
+        index = reverse('posts:index')
+        group = reverse('posts:group_list', args=(self.group.slug,))
+        detail = reverse('posts:post_detail', args=(self.post.pk,))
+        profile = reverse('posts:profile', args=(self.author.username,))
+        changes = [
+            ([index, group, profile], lambda: Post.objects.create(
+                author=self.author, group=self.group, text='Второй пост'
+            )),
+            ([detail], lambda: Comment.objects.create(
+                post=self.post, author=self.reader, text='Комментарий'
+            )),
+            ([profile], lambda: Follow.objects.create(
+                user=self.reader, author=self.author
+            )),
+        ]
+        for urls, change in changes:
+            for url in urls:
+                self.client.get(url)
+                self.assertEqual(self.client.get(url)['X-Page-Cache'], 'hit')
+            change()
+            for url in urls:
+                with self.subTest(url=url):
+                    response = self.client.get(url)
+                    self.assertEqual(response['X-Page-Cache'], 'miss')
+
+    def test_cached_detail_counts_view(self):
+        url = reverse('posts:post_detail', args=(self.post.pk,))
+        self.client.get(url)
+        self.client.get(url)
+        self.assertEqual(view_counts.views.drain(), {self.post.pk: 2})
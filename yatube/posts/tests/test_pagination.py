@@ -0,0 +1,37 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Follow, Post
+
+User = get_user_model()
+
+
+class FeedCountsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.reader)
+
+    def count(self, url):
+        return self.client.get(url).context['page_obj'].paginator.count
+
+    def test_new_post_resets_cached_counts(self):
+        """Новый пост сбрасывает счётчики ленты, профиля и подписок."""
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:profile', args=(self.author.username,)),
+            reverse('posts:follow_index'),
+        )
+        for url in urls:
+            self.assertEqual(self.count(url), 0)
+        Post.objects.create(author=self.author, text='Новый пост')
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.count(url), 1)
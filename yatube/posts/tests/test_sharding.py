@@ -0,0 +1,192 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+from zlib import crc32
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ..models import (Comment, Follow, Group, GroupStats, Post, PostTag,
+                      User)
+from ..sharding import (
+    MergedFeed, _location_key, locate_post, shard_for_author
+)
+from ..stats import refresh_stats
+
+
+class ShardingTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.first = User.objects.create(username='FirstAuthor')
+        cls.second = User.objects.create(username='SecondAuthor')
+        for i in range(3):
+            Post.objects.create(author=cls.first, text=f'Первый {i}')
+            Post.objects.create(author=cls.second, text=f'Второй {i}')
+
+    @override_settings(POST_SHARDS=['default', 'shard1', 'shard2'])
+    def test_author_always_maps_to_same_shard(self):
+        """Шард автора вычисляется детерминированно."""
+        shard = shard_for_author(self.first.pk)
+        self.assertIn(shard, ['default', 'shard1', 'shard2'])
+        self.assertEqual(shard_for_author(self.first.pk), shard)
+
+    def test_merged_feed_keeps_date_order(self):
+        """Слияние частей ленты сохраняет порядок по дате."""
+        feed = MergedFeed([
+            Post.objects.filter(author=self.first),
+            Post.objects.filter(author=self.second),
+        ])
+        self.assertEqual(feed.count(), 6)
+        self.assertEqual(feed[1:4], list(Post.objects.all()[1:4]))
+        self.assertEqual(feed[0], Post.objects.all()[0])
+
+    def test_single_shard_returns_querysets(self):
+        """С одним шардом менеджер отдаёт обычные QuerySet."""
+        self.assertEqual(
+            list(Post.objects.feed()), list(Post.objects.all())
+        )
+        self.assertEqual(
+            Post.objects.for_author(self.first).count(), 3
+        )
+
+
+@override_settings(POST_SHARDS=['default', 'shard1'])
+class TwoShardsTestCase(TestCase):
+    """Тесты с двумя настоящими базами: default и временной shard1."""
+    databases = {'default', 'shard1'}
+
+    @classmethod
+    def setUpClass(cls):
+        cls.shard_dir = tempfile.mkdtemp()
+        connections.databases['shard1'] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(cls.shard_dir, 'shard1.sqlite3'),
+        }
+        connections.ensure_defaults('shard1')
+        connections.prepare_test_settings('shard1')
+        with override_settings(POST_SHARDS=['default', 'shard1']):
+            call_command('migrate', database='shard1', verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['shard1'].close()
+        del connections.databases['shard1']
+        delattr(connections._connections, 'shard1')
+        shutil.rmtree(cls.shard_dir, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+
+class RebalanceShardsTest(TwoShardsTestCase):
+    """Перенос автора между двумя настоящими базами."""
+
+    def test_author_moves_with_comments_and_location(self):
+        with override_settings(POST_SHARDS=['default']):
+            author = next(
+                user for user in (
+                    User.objects.create(username=f'Author{i}')
+                    for i in range(10)
+                )
+                if crc32(str(user.pk).encode()) % 2 == 1
+            )
+            posts = [
+                Post.objects.create(author=author, text=f'Пост {i}')
+                for i in range(3)
+            ]
+            Comment.objects.create(
+                post=posts[0], author=author, text='Комментарий'
+            )
+        self.assertEqual(shard_for_author(author.pk), 'shard1')
+
+        call_command('rebalance_shards', batch_size=2, stdout=StringIO())
+
+        self.assertFalse(Post.objects.using('default').exists())
+        self.assertEqual(
+            Post.objects.using('shard1').filter(author=author).count(), 3
+        )
+        self.assertEqual(
+            Comment.objects.using('shard1').get().post_id, posts[0].pk
+        )
+        self.assertFalse(Comment.objects.using('default').exists())
+        for post in posts:
+            self.assertEqual(cache.get(_location_key(post.pk)), 'shard1')
+            self.assertEqual(locate_post(post.pk), 'shard1')
+            self.assertEqual(
+                Post.objects.locate(post.pk).get(pk=post.pk).text, post.text
+            )
+
+    def test_rebalance_keeps_group_stats_and_tags(self):
+        """Переезд не вычитает посты из статистики группы и индекса тегов."""
+        with override_settings(POST_SHARDS=['default']):
+            group = Group.objects.create(
+                title='Группа', slug='moving-group', description='Описание'
+            )
+            author = next(
+                user for user in (
+                    User.objects.create(username=f'Mover{i}')
+                    for i in range(10)
+                )
+                if crc32(str(user.pk).encode()) % 2 == 1
+            )
+            for i in range(3):
+                Post.objects.create(
+                    author=author, group=group, text=f'Пост {i} #тег'
+                )
+        call_command('rebalance_shards', batch_size=2, stdout=StringIO())
+        self.assertEqual(Post.objects.using('shard1').count(), 3)
+        self.assertEqual(GroupStats.objects.get(group=group).post_count, 3)
+        self.assertEqual(PostTag.objects.count(), 3)
+        refresh_stats([group.pk])
+        stats = GroupStats.objects.get(group=group)
+        self.assertEqual((stats.post_count, stats.week_post_count), (3, 3))
+
+
+class ShardedViewsTest(TwoShardsTestCase):
+    """Страницы с настоящими двумя шардами."""
+
+    def setUp(self):
+        super().setUp()
+        self.authors = [
+            User.objects.create(username=f'Writer{i}') for i in range(6)
+        ]
+        self.reader = User.objects.create(username='ShardReader')
+
+    def test_created_post_lands_in_author_shard(self):
+        """Пост из формы попадает в шард автора и виден в профиле."""
+        for author in self.authors:
+            self.client.force_login(author)
+            self.client.post(
+                reverse('posts:post_create'), {'text': f'От {author}'}
+            )
+            shard = shard_for_author(author.pk)
+            self.assertTrue(
+                Post.objects.using(shard).filter(author=author).exists()
+            )
+            response = self.client.get(
+                reverse('posts:profile', args=(author.username,))
+            )
+            self.assertEqual(len(response.context['page_obj']), 1)
+        self.assertEqual(
+            {shard_for_author(author.pk) for author in self.authors},
+            {'default', 'shard1'},
+        )
+
+    def test_follow_feed_merges_shards(self):
+        """Лента подписок собирает посты авторов из обоих шардов."""
+        for author in self.authors:
+            Post(author=author, text=f'От {author}').save()
+            Follow.objects.create(user=self.reader, author=author)
+        self.client.force_login(self.reader)
+        response = self.client.get(reverse('posts:follow_index'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            len(response.context['page_obj']), len(self.authors)
+        )
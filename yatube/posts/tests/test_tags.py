@@ -0,0 +1,73 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from yatube.settings import NUM_OF_POSTS
+from ..models import Mention, Post, PostTag
+
+User = get_user_model()
+
+
+class TagIndexTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+
+    def create_post(self, text):
+        return Post.objects.create(author=self.author, text=text)
+
+    def test_post_save_updates_index(self):
+        """Хэштеги и упоминания индексируются и обновляются при правке."""
+        post = self.create_post('#Django для @reader и @nobody')
+        self.assertEqual(
+            list(PostTag.objects.values_list('tag__name', flat=True)),
+            ['django'],
+        )
+        self.assertTrue(
+            Mention.objects.filter(user=self.reader, post_id=post.pk).exists()
+        )
+        post.text = '#python'
+        post.save()
+        self.assertEqual(
+            list(PostTag.objects.values_list('tag__name', flat=True)),
+            ['python'],
+        )
+        self.assertFalse(Mention.objects.exists())
+        post.delete()
+        self.assertFalse(PostTag.objects.exists())
+
+    def test_tag_feed_uses_cursor(self):
+        posts = [
+            self.create_post(f'Пост {i} #тест')
+            for i in range(NUM_OF_POSTS + 2)
+        ]
+        url = reverse('posts:tag_posts', args=('Тест',))
+        response = self.client.get(url)
+        self.assertEqual(len(response.context['posts']), NUM_OF_POSTS)
+        self.assertEqual(response.context['posts'][0], posts[-1])
+        response = self.client.get(
+            url, {'after': response.context['next_cursor']}
+        )
+        self.assertEqual(response.context['posts'], posts[1::-1])
+        self.assertIsNone(response.context['next_cursor'])
+
+    def test_mentions_feed(self):
+        post = self.create_post('Спасибо, @reader')
+        response = self.client.get(
+            reverse('posts:mentions', args=(self.reader.username,))
+        )
+        self.assertEqual(response.context['posts'], [post])
+
+    def test_backfill_command(self):
+        post = self.create_post('#старое')
+        PostTag.objects.all().delete()
+        call_command('index_tags', batch_size=1, stdout=StringIO())
+        self.assertTrue(
+            PostTag.objects.filter(
+                post_id=post.pk, tag__name='старое'
+            ).exists()
+        )
@@ -0,0 +1,80 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import trending
+from ..models import Comment, Group, Post, TrendingBucket, User
+
+
+def cancel_timer():
+    timer = trending.events.timer
+    if timer is not None:
+        timer.cancel()
+        trending.events.timer = None
+
+
+class TrendingTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='TrendUser')
+        cls.group = Group.objects.create(
+            title='Горячая группа', slug='hot-group', description='Описание'
+        )
+        cls.quiet = Post.objects.create(author=cls.user, text='Тихий пост')
+        cls.hot = Post.objects.create(
+            author=cls.user, text='Горячий пост', group=cls.group
+        )
+
+    def setUp(self):
+        cancel_timer()
+        cache.clear()
+        trending.events.drain()
+
+    def tearDown(self):
+        cancel_timer()
+
+    def test_events_are_buffered_then_flushed(self):
+        """Комментарии копятся в памяти и пишутся в базу пачкой."""
+        Comment.objects.create(post=self.hot, author=self.user, text='Да')
+        Comment.objects.create(post=self.hot, author=self.user, text='Нет')
+        self.assertFalse(
+            TrendingBucket.objects.filter(kind=trending.POST).exists()
+        )
+        trending.flush()
+        bucket = TrendingBucket.objects.get(
+            kind=trending.POST, object_id=self.hot.pk
+        )
+        self.assertEqual(bucket.count, 2)
+
+    def test_trending_page_serves_cached_rankings(self):
+        """Страница показывает рейтинг из кэша без обращения к базе."""
+        Comment.objects.create(post=self.quiet, author=self.user, text='Ок')
+        for _ in range(3):
+            Comment.objects.create(post=self.hot, author=self.user, text='!')
+        trending.recompute()
+        self.assertEqual(
+            [post['pk'] for post in trending.trending(trending.POST)],
+            [self.hot.pk, self.quiet.pk],
+        )
+        client = Client()
+        with self.assertNumQueries(0):
+            response = client.get(reverse('posts:trending'))
+        self.assertEqual(response.context['groups'][0]['slug'], 'hot-group')
+
+    def test_rankings_survive_separate_cache(self):
+        """Списки из фоновой задачи видны процессу с пустым кэшем."""
+        Comment.objects.create(post=self.hot, author=self.user, text='!')
+        trending.recompute()
+        cache.clear()
+        self.assertEqual(
+            [post['pk'] for post in trending.trending(trending.POST)],
+            [self.hot.pk],
+        )
+        with self.assertNumQueries(0):
+            trending.trending(trending.POST)
+
+    def test_record_schedules_flush(self):
+        """Без новых событий буфер сбросит таймер."""
+        trending.record(trending.POST, self.hot.pk)
+        self.assertIsNotNone(trending.events.timer)
@@ -1,4 +1,5 @@
 from http import HTTPStatus
+from django.core.cache import cache
 from django.test import TestCase, Client
 from django.urls import reverse
 from ..models import Post, Group, User
@@ -98,3 +99,13 @@ class PostURLTests(TestCase):
             with self.subTest(template=template):
                 response = self.authorized_client.get(url)
                 self.assertTemplateUsed(response, template)
+
+    def test_anonymous_not_found_prerendered(self):
+        """Анонимный 404 по несуществующему посту без запросов к базе."""
+        cache.clear()
+        self.guest_client.get(f'/posts/{self.post.pk}/')
+        url = f'/posts/{self.post.pk + 10 ** 6}/'
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+        self.assertContains(response, url, status_code=HTTPStatus.NOT_FOUND)
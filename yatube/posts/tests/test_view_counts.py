@@ -0,0 +1,84 @@
+import time
+from unittest import mock
+
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from .. import view_counts
+from ..models import Post, User
+
+
+class ViewCountTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create(username='Viewed')
+        cls.post = Post.objects.create(author=cls.user, text='Пост')
+        cls.other = Post.objects.create(author=cls.user, text='Другой')
+
+    def setUp(self):
+        view_counts.views.drain()
+
+    def tearDown(self):
+        cancel_timer()
+
+    def test_views_are_buffered(self):
+        """Просмотр не пишет в базу до сброса буфера."""
+        client = Client()
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        client.get(url)
+        client.get(url)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.view_count, 0)
+        self.assertEqual(view_counts.views.pending(self.post.pk), 2)
+
+    def test_flush_is_one_update(self):
+        """Сброс записывает все счётчики одним запросом."""
+        view_counts.record_view(self.post)
+        view_counts.record_view(self.post)
+        view_counts.record_view(self.other)
+        with self.assertNumQueries(1):
+            view_counts.flush()
+        self.post.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual(self.post.view_count, 2)
+        self.assertEqual(self.other.view_count, 1)
+
+    def test_flush_refreshes_cached_post(self):
+        """После сброса страница поста показывает новый счётчик."""
+        url = reverse('posts:post_detail', kwargs={'post_id': self.post.pk})
+        self.client.get(url)
+        view_counts.flush()
+        response = self.client.get(url)
+        self.assertEqual(response.context['post'].view_count, 1)
+
+
+def cancel_timer():
+    timer = view_counts.views.timer
+    if timer is not None:
+        timer.cancel()
+        view_counts.views.timer = None
+
+
+class IdleFlushTest(TransactionTestCase):
+    def setUp(self):
+        cancel_timer()
+        view_counts.views.drain()
+        self.post = Post.objects.create(
+            author=User.objects.create(username='Idle'), text='Пост'
+        )
+
+    def tearDown(self):
+        cancel_timer()
+
+    def test_idle_buffer_is_flushed_by_timer(self):
+        """Без новых просмотров буфер сбрасывается по таймеру."""
+        with mock.patch.object(view_counts.views, 'flush_interval', 0.05):
+            view_counts.views.last_flush = time.monotonic()
+            view_counts.record_view(self.post)
+            timer = view_counts.views.timer
+            self.assertIsNotNone(timer)
+            timer.join(2)
+        self.assertEqual(view_counts.views.pending(self.post.pk), 0)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.view_count, 1)
@@ -0,0 +1,139 @@
+import json
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, connections, transaction
+from django.db.models import F
+
+from core.counters import RingCounter
+from .models import Group, Post, TrendingBucket, TrendingList
+
+POST = 'post'
+GROUP = 'group'
+CACHE_KEY = 'trending:{}'
+
+events = RingCounter(
+    size=4,
+    width=settings.TRENDING_BUCKET_SECONDS,
+    flush_interval=settings.TRENDING_FLUSH_SECONDS,
+)
+
+
+def record(kind, object_id):
+    """Учитывает событие; раз в TRENDING_FLUSH_SECONDS сбрасывает буфер.
+
+    Если новых событий нет, буфер сбрасывает таймер.
+    """
+    if object_id is None:
+        return
+    events.add((kind, object_id))
+    if events.due():
+        flush()
+    else:
+        events.schedule(flush_in_background)
+
+
+def flush_in_background():
+    """Сброс из потока таймера; соединения потока закрываются после."""
+    try:
+        flush()
+    finally:
+        connections.close_all()
+
+
+def flush():
+    """Записывает накопленные счётчики в базу одной транзакцией."""
+    counts = events.drain()
+    if not counts:
+        return
+    with transaction.atomic():
+        for (bucket, (kind, object_id)), amount in counts.items():
+            rows = TrendingBucket.objects.filter(
+                kind=kind, object_id=object_id, bucket=bucket
+            )
+            if rows.update(count=F('count') + amount):
+                continue
+            try:
+                with transaction.atomic():
+                    rows.create(
+                        kind=kind, object_id=object_id, bucket=bucket,
+                        count=amount,
+                    )
+            except IntegrityError:
+                rows.update(count=F('count') + amount)
+
+
+def scores(now=None):
+    """Затухающие очки объектов за окно TRENDING_WINDOW_BUCKETS."""
+    current = events.bucket(now)
+    oldest = current - settings.TRENDING_WINDOW_BUCKETS
+    result = defaultdict(float)
+    rows = TrendingBucket.objects.filter(bucket__gt=oldest).values_list(
+        'kind', 'object_id', 'bucket', 'count'
+    )
+    for kind, object_id, bucket, count in rows.iterator():
+        age = max(current - bucket, 0)
+        result[kind, object_id] += count * settings.TRENDING_DECAY ** age
+    return result, oldest
+
+
+def top(kind, ranked):
+    return [
+        object_id for (item_kind, object_id), _ in ranked
+        if item_kind == kind
+    ][:settings.TRENDING_TOP]
+
+
+def recompute(now=None):
+    """Пересчитывает рейтинги и сохраняет готовые списки в TrendingList.
+
+    Запускается фоновой задачей. Счётчики веб-процессов она не видит:
+    каждый процесс сам сбрасывает свой буфер в базу.
+    """
+    flush()
+    result, oldest = scores(now)
+    ranked = sorted(result.items(), key=lambda item: item[1], reverse=True)
+    post_ids = top(POST, ranked)
+    group_ids = top(GROUP, ranked)
+    posts = {}
+    for alias in settings.POST_SHARDS:
+        posts.update(
+            Post.objects.using(alias).select_related('author')
+            .in_bulk(post_ids)
+        )
+    groups = Group.objects.in_bulk(group_ids)
+    lists = {
+        POST: [
+            {
+                'pk': posts[pk].pk,
+                'text': posts[pk].text[:100],
+                'author': posts[pk].author.username,
+            }
+            for pk in post_ids if pk in posts
+        ],
+        GROUP: [
+            {'slug': groups[pk].slug, 'title': groups[pk].title}
+            for pk in group_ids if pk in groups
+        ],
+    }
+    for kind, items in lists.items():
+        TrendingList.objects.update_or_create(
+            kind=kind, defaults={'items': json.dumps(items)}
+        )
+    cache.set_many(
+        {CACHE_KEY.format(kind): items for kind, items in lists.items()},
+        settings.TRENDING_CACHE_SECONDS,
+    )
+    TrendingBucket.objects.filter(bucket__lte=oldest).delete()
+
+
+def trending(kind):
+    """Список из кэша процесса, при промахе — из TrendingList."""
+    key = CACHE_KEY.format(kind)
+    items = cache.get(key)
+    if items is None:
+        row = TrendingList.objects.filter(kind=kind).first()
+        items = json.loads(row.items) if row else []
+        cache.set(key, items, settings.TRENDING_CACHE_SECONDS)
+    return items
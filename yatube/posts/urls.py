@@ -4,9 +4,24 @@ from posts import views
 app_name = 'posts'
 
 urlpatterns = [
+    path('group/', views.group_index, name='group_index'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
+    path('group/<slug:slug>/feed/', views.group_feed, name='group_feed'),
     path('', views.index, name='index'),
+    path('feed/', views.index_feed, name='index_feed'),
+    path('trending/', views.trending, name='trending'),
+    path('tags/<str:name>/', views.tag_posts, name='tag_posts'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path(
+        'profile/<str:username>/feed/',
+        views.profile_feed,
+        name='profile_feed'
+    ),
+    path(
+        'profile/<str:username>/mentions/',
+        views.mentions,
+        name='mentions'
+    ),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
@@ -14,6 +29,8 @@ urlpatterns = [
         'posts/<int:post_id>/comment/', views.add_comment, name='add_comment'
     ),
     path('follow/', views.follow_index, name='follow_index'),
+    path('follow/feed/', views.follow_feed, name='follow_feed'),
+    path('notifications/', views.notifications, name='notifications'),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
@@ -0,0 +1,62 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Case, F, IntegerField, Value, When
+
+from core.counters import BufferedCounter
+from core.entities import forget
+from .models import Post
+from .sharding import is_sharded, locate_post
+
+views = BufferedCounter(settings.VIEW_COUNT_FLUSH_SECONDS)
+
+
+def record_view(post):
+    """Учитывает просмотр в памяти; база обновляется при сбросе буфера.
+
+    Счётчик на карточке отстаёт не больше чем на VIEW_COUNT_FLUSH_SECONDS:
+    если новых просмотров нет, буфер сбрасывает таймер. Просмотры,
+    не сброшенные до остановки процесса, теряются.
+    """
+    if not getattr(post, 'is_archived', False):
+        record_view_id(post.pk)
+
+
+def record_view_id(post_id):
+    """Просмотр по id, когда самого поста нет (страница из кэша)."""
+    views.add(post_id)
+    if views.due():
+        flush()
+    else:
+        views.schedule(flush_in_background)
+
+
+def flush_in_background():
+    """Сброс из потока таймера; соединения потока закрываются после."""
+    try:
+        flush()
+    finally:
+        connections.close_all()
+
+
+def flush():
+    """Записывает накопленные просмотры одним UPDATE на каждый шард.
+
+    Обновлённые посты сбрасываются из кэша объектов, иначе страница
+    поста показывала бы счётчик из закэшированной копии.
+    """
+    by_shard = defaultdict(dict)
+    for pk, amount in views.drain().items():
+        alias = locate_post(pk) if is_sharded() else 'default'
+        by_shard[alias][pk] = amount
+    for alias, counts in by_shard.items():
+        Post.objects.using(alias).filter(pk__in=counts).update(
+            view_count=F('view_count') + Case(
+                *(When(pk=pk, then=Value(amount))
+                  for pk, amount in counts.items()),
+                default=Value(0),
+                output_field=IntegerField(),
+            )
+        )
+        forget(Post, 'pk', *counts)
@@ -1,41 +1,230 @@
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.core.cache import cache
+from django.http import (
+    Http404, HttpResponse, HttpResponseBadRequest, JsonResponse
+)
 from django.shortcuts import get_object_or_404, redirect, render
-from yatube.settings import NUM_OF_POSTS
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from core.cursors import decode_cursor, encode_cursor, keyset_page
+from core.entities import get_cached_object_or_404
+from core.paginator import CachedCountPaginator
+from core.ratelimit import ratelimit
+from core.routers import pin_to_primary, read_from_replica
+from yatube.settings import (
+    FEED_FRAGMENT_CACHE_SECONDS, NUM_OF_GROUPS, NUM_OF_POSTS
+)
+from . import counts, trending as trending_engine
+from .archive import ArchiveFeed, get_post_or_archived
+from .feeds import feed_page
+from .notifications import mark_read
+from .tags import load_posts
+from .view_counts import record_view
 from .forms import PostForm, CommentForm
-from .models import Group, Post, User, Comment, Follow
+from .models import (
+    ArchivedPost, Group, GroupStats, Mention, Post, PostTag, Tag, User,
+    Follow
+)
 
 
+def next_cursor(page_obj):
+    """Курсор для подгрузки после последнего поста страницы."""
+    if not page_obj.has_next() or not len(page_obj):
+        return None
+    last = page_obj[-1]
+    return encode_cursor(last.pub_date, last.pk)
+
+
+def serialize_post(post):
+    return {
+        'id': post.pk,
+        'author': post.author.username,
+        'group': post.group.slug if post.group else None,
+        'pub_date': post.pub_date.isoformat(),
+        'text_html': post.rendered_text,
+        'image': post.image.url if post.image else None,
+        'url': reverse('posts:post_detail', args=[post.pk]),
+    }
+
+
+def feed_fragment(request, scope, hot, archived, public=True, **context):
+    """Следующая порция ленты после ?after= для бесконечной прокрутки.
+
+    По умолчанию — HTML карточек, с ?format=json — список постов.
+    Курсор следующей порции в заголовке X-Next-Cursor (пустой в конце).
+    Публичные ленты одинаковы для всех, поэтому готовый ответ
+    кэшируется на FEED_FRAGMENT_CACHE_SECONDS. Ключ строится по заново
+    закодированному курсору: испорченный курсор — ошибка 400, а разные
+    записи одного курсора не плодят записи в кэше.
+    """
+    cursor = request.GET.get('after', '')
+    if cursor:
+        position = decode_cursor(cursor)
+        if position is None:
+            return HttpResponseBadRequest('Неверный курсор')
+        cursor = encode_cursor(*position)
+    fmt = 'json' if request.GET.get('format') == 'json' else 'html'
+    key = f'fragment:{scope}:{fmt}:{cursor}'
+    cached = cache.get(key) if public else None
+    if cached is None:
+        posts, cursor = feed_page(hot, archived, cursor, NUM_OF_POSTS)
+        if fmt == 'json':
+            body = {
+                'posts': [serialize_post(post) for post in posts],
+                'next': cursor,
+            }
+        else:
+            body = render_to_string(
+                'posts/includes/post_list.html',
+                {'posts': posts, **context},
+            )
+        cached = body, cursor
+        if public:
+            cache.set(key, cached, FEED_FRAGMENT_CACHE_SECONDS)
+    body, cursor = cached
+    if fmt == 'json':
+        response = JsonResponse(body)
+    else:
+        response = HttpResponse(body)
+    response['X-Next-Cursor'] = cursor or ''
+    if public:
+        patch_cache_control(
+            response, public=True, max_age=FEED_FRAGMENT_CACHE_SECONDS
+        )
+    else:
+        patch_cache_control(response, private=True)
+    return response
+
+
+@read_from_replica
 def index(request):
-    post_list = Post.objects.all()
-    paginator = Paginator(post_list, NUM_OF_POSTS)
+    post_list = ArchiveFeed(Post.objects.feed(), ArchivedPost.objects.all())
+    paginator = CachedCountPaginator(
+        post_list, NUM_OF_POSTS, scope=counts.INDEX
+    )
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
 
     context = {
         'page_obj': page_obj,
+        'next_cursor': next_cursor(page_obj),
     }
     return render(request, 'posts/index.html', context)
 
 
+@read_from_replica
+def index_feed(request):
+    return feed_fragment(
+        request,
+        counts.INDEX,
+        Post.objects.feed(),
+        ArchivedPost.objects.all(),
+    )
+
+
+@read_from_replica
+def group_index(request):
+    stats = GroupStats.objects.select_related('group')
+    paginator = CachedCountPaginator(
+        stats, NUM_OF_GROUPS, scope=counts.GROUPS
+    )
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
+
+    context = {
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/group_index.html', context)
+
+
+def trending(request):
+    context = {
+        'posts': trending_engine.trending(trending_engine.POST),
+        'groups': trending_engine.trending(trending_engine.GROUP),
+    }
+    return render(request, 'posts/trending.html', context)
+
+
+@read_from_replica
 def group_posts(request, slug):
-    group = get_object_or_404(Group, slug=slug)
-    posts = Post.objects.filter(group=group)
-    paginator = Paginator(posts, NUM_OF_POSTS)
+    group = get_cached_object_or_404(Group, slug=slug)
+    posts = ArchiveFeed(
+        Post.objects.feed(group=group),
+        ArchivedPost.objects.filter(group=group),
+    )
+    paginator = CachedCountPaginator(
+        posts,
+        NUM_OF_POSTS,
+        scope=counts.group_scope(group.pk),
+        estimate=GroupStats.objects.filter(group=group).values_list(
+            'post_count', flat=True
+        ).first,
+    )
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
 
     context = {
         'group': group,
         'page_obj': page_obj,
+        'next_cursor': next_cursor(page_obj),
     }
     return render(request, 'posts/group_list.html', context)
 
 
+@read_from_replica
+def group_feed(request, slug):
+    group = get_cached_object_or_404(Group, slug=slug)
+    return feed_fragment(
+        request,
+        counts.group_scope(group.pk),
+        Post.objects.feed(group=group),
+        ArchivedPost.objects.filter(group=group),
+        hide_group=True,
+    )
+
+
+def indexed_feed(request, entries, title):
+    """Лента по записям индекса: keyset по (pub_date, post_id)."""
+    entries, cursor = keyset_page(
+        entries, request.GET.get('after'), NUM_OF_POSTS, pk_field='post_id'
+    )
+    context = {
+        'title': title,
+        'posts': load_posts([entry.post_id for entry in entries]),
+        'next_cursor': cursor,
+    }
+    return render(request, 'posts/tagged.html', context)
+
+
+@read_from_replica
+def tag_posts(request, name):
+    tag = get_object_or_404(Tag, name=name.lower())
+    return indexed_feed(
+        request, PostTag.objects.filter(tag=tag), f'#{tag.name}'
+    )
+
+
+@read_from_replica
+def mentions(request, username):
+    user = get_cached_object_or_404(User, username=username)
+    return indexed_feed(
+        request,
+        Mention.objects.filter(user=user),
+        f'Упоминания @{user.username}',
+    )
+
+
+@read_from_replica
 def profile(request, username):
-    author = get_object_or_404(User, username=username)
-    posts = Post.objects.filter(author=author)
-    paginator = Paginator(posts, NUM_OF_POSTS)
+    author = get_cached_object_or_404(User, username=username)
+    posts = ArchiveFeed(
+        Post.objects.for_author(author),
+        ArchivedPost.objects.filter(author=author),
+    )
+    paginator = CachedCountPaginator(
+        posts, NUM_OF_POSTS, scope=counts.author_scope(author.pk)
+    )
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     following = Follow.objects.filter(
@@ -46,14 +235,31 @@ def profile(request, username):
         'author': author,
         'page_obj': page_obj,
         'following': following,
+        'next_cursor': next_cursor(page_obj),
     }
     return render(request, 'posts/profile.html', context)
 
 
+@read_from_replica
+def profile_feed(request, username):
+    author = get_cached_object_or_404(User, username=username)
+    return feed_fragment(
+        request,
+        counts.author_scope(author.pk),
+        Post.objects.for_author(author),
+        ArchivedPost.objects.filter(author=author),
+        hide_author=True,
+    )
+
+
+@read_from_replica
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_post_or_archived(Post.objects.locate(post_id), post_id)
+    if post is None:
+        raise Http404
+    record_view(post)
     form = CommentForm(data=request.POST or None)
-    comments = Comment.objects.filter(post=post)
+    comments = post.comments.all()
     context = {
         'post': post,
         'form': form,
@@ -62,7 +268,9 @@ def post_detail(request, post_id):
     return render(request, 'posts/post_detail.html', context)
 
 
+@ratelimit('post_create')
 @login_required
+@pin_to_primary
 def post_create(request):
     form = PostForm(
         data=request.POST,
@@ -77,8 +285,9 @@ def post_create(request):
 
 
 @login_required
+@pin_to_primary
 def post_edit(request, post_id):
-    is_edit = get_object_or_404(Post, pk=post_id)
+    is_edit = get_object_or_404(Post.objects.locate(post_id), pk=post_id)
     if is_edit.author != request.user:
         return redirect('posts:post_detail', post_id=post_id)
 
@@ -99,42 +308,107 @@ def post_edit(request, post_id):
     return render(request, 'posts/create_post.html', context)
 
 
+@ratelimit('add_comment')
 @login_required
+@pin_to_primary
 def add_comment(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    """Добавляет комментарий.
+
+    Запрос из fetch (X-Requested-With) получает HTML нового комментария
+    со статусом 201 или ошибки формы в JSON со статусом 400, без
+    перерисовки страницы поста. Обычная отправка формы — редирект.
+    """
+    post = get_cached_object_or_404(Post.objects.locate(post_id), pk=post_id)
     form = CommentForm(request.POST or None)
     if form.is_valid():
         comment = form.save(commit=False)
         comment.author = request.user
         comment.post = post
         comment.save()
+        if request.is_ajax():
+            return HttpResponse(
+                render_to_string(
+                    'posts/includes/comment.html', {'comment': comment}
+                ),
+                status=201,
+            )
+    elif request.is_ajax():
+        return JsonResponse({'errors': form.errors}, status=400)
     return redirect('posts:post_detail', post_id=post_id)
 
 
 @login_required
+@read_from_replica
 def follow_index(request):
-    follower = Post.objects.filter(
-        author__following__user=request.user
+    authors = Follow.objects.filter(user=request.user).values_list(
+        'author', flat=True
+    )
+    follower = ArchiveFeed(
+        Post.objects.feed(author__in=authors),
+        ArchivedPost.objects.filter(author__in=authors),
+    )
+    paginator = CachedCountPaginator(
+        follower, NUM_OF_POSTS, scope=counts.follow_scope(request.user.pk)
     )
-    paginator = Paginator(follower, NUM_OF_POSTS)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     context = {
         'page_obj': page_obj,
+        'next_cursor': next_cursor(page_obj),
     }
     return render(request, 'posts/follow.html', context)
 
 
 @login_required
+@read_from_replica
+def follow_feed(request):
+    authors = Follow.objects.filter(user=request.user).values_list(
+        'author', flat=True
+    )
+    return feed_fragment(
+        request,
+        counts.follow_scope(request.user.pk),
+        Post.objects.feed(author__in=authors),
+        ArchivedPost.objects.filter(author__in=authors),
+        public=False,
+    )
+
+
+@login_required
+@pin_to_primary
+def notifications(request):
+    """Сводки пользователя; POST отмечает все сводки прочитанными.
+
+    Просмотр ничего не меняет: GET может повториться (предзагрузка
+    браузера, обновление страницы) и не должен писать в базу.
+    """
+    if request.method == 'POST':
+        mark_read(request.user.pk)
+        return redirect('posts:notifications')
+    paginator = CachedCountPaginator(
+        request.user.digests.all(), NUM_OF_POSTS
+    )
+    page_number = request.GET.get('page')
+    page_obj = paginator.get_page(page_number)
+    context = {
+        'page_obj': page_obj,
+    }
+    return render(request, 'posts/notifications.html', context)
+
+
+@ratelimit('profile_follow')
+@login_required
+@pin_to_primary
 def profile_follow(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_cached_object_or_404(User, username=username)
     if author != request.user:
         Follow.objects.get_or_create(user=request.user, author=author)
     return redirect('posts:follow_index')
 
 
 @login_required
+@pin_to_primary
 def profile_unfollow(request, username):
-    author = get_object_or_404(User, username=username)
+    author = get_cached_object_or_404(User, username=username)
     Follow.objects.filter(user=request.user, author=author).delete()
     return redirect('posts:follow_index')
@@ -2,6 +2,11 @@ import os
 
 
 NUM_OF_POSTS = 10
+NUM_OF_GROUPS = 30
+PAGINATOR_WINDOW = 3
+PAGINATOR_COUNT_TIMEOUT = 10 * 60
+PAGINATOR_ESTIMATE_THRESHOLD = 10000
+FEED_FRAGMENT_CACHE_SECONDS = 30
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
@@ -14,6 +19,15 @@ EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+MEDIA_SERVE_PREFIXES = ['posts/', 'cache/']
+MEDIA_MAX_AGE = 7 * 24 * 60 * 60
+# 'X-Accel-Redirect' для nginx или 'X-Sendfile' для Apache: тогда файл
+# отдаёт веб-сервер, а Django только проверяет запрос.
+MEDIA_SENDFILE_HEADER = None
+MEDIA_ACCEL_PREFIX = '/protected-media/'
+MEDIA_GC_BATCH_SIZE = 200
+MEDIA_GC_PAUSE = 0.5
+MEDIA_GC_GRACE_HOURS = 24
 
 DEBUG = True
 
@@ -47,6 +61,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.static.StaticFilesMiddleware',
+    'core.middleware.compression.CompressionMiddleware',
+    'core.middleware.pagecache.PageCacheMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -76,6 +93,7 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
                 'core.context_processors.year.year',
+                'core.context_processors.notifications.unread_notifications',
             ],
         },
     },
@@ -87,9 +105,123 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': 60,
     }
 }
 
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'busy_timeout': 5000,
+}
+
+# Реплика только для чтения, например скопированный файл SQLite.
+REPLICA_DB_PATH = os.getenv('YATUBE_REPLICA_DB')
+if REPLICA_DB_PATH:
+    DATABASES['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': REPLICA_DB_PATH,
+        'CONN_MAX_AGE': 60,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+# Только реплики: шарды из POST_SHARDS сюда не входят.
+DATABASE_REPLICAS = ['replica'] if REPLICA_DB_PATH else []
+DATABASE_ROUTERS = [
+    'posts.sharding.ShardRouter',
+    'core.routers.ReplicaRouter',
+]
+REPLICA_APP_LABELS = ['posts', 'auth']
+REPLICA_PIN_SECONDS = 10
+
+# Псевдонимы баз из DATABASES, между которыми делятся посты авторов.
+POST_SHARDS = ['default']
+SHARD_LOCATION_TIMEOUT = 60 * 60 * 24
+
+POST_ARCHIVE_DAYS = 90
+POST_ARCHIVE_BATCH_SIZE = 500
+
+DELETION_BATCH_SIZE = 500
+DELETION_PAUSE = 0.1
+
+BULK_POSTS_BATCH_SIZE = 1000
+BULK_POSTS_PAUSE = 0.05
+
+TRENDING_BUCKET_SECONDS = 5 * 60
+TRENDING_WINDOW_BUCKETS = 24 * 12
+TRENDING_DECAY = 0.97
+TRENDING_FLUSH_SECONDS = 30
+TRENDING_TOP = 10
+TRENDING_CACHE_SECONDS = 60
+
+VIEW_COUNT_FLUSH_SECONDS = 60
+
+DUPLICATE_INDEX_SIZE = 50000
+DUPLICATE_MIN_WORDS = 5
+
+MARKUP_CACHE_TIMEOUT = 24 * 60 * 60
+RERENDER_BATCH_SIZE = 500
+MARKUP_URLS = {
+    'tag': 'posts:tag_posts',
+    'mention': 'posts:profile',
+}
+
+TAG_INDEX_BATCH_SIZE = 500
+
+NOTIFICATIONS_CACHE_SECONDS = 5 * 60
+
+PAGE_CACHE_ENABLED = not DEBUG
+PAGE_CACHE_SECONDS = 10 * 60
+PAGE_CACHE_VIEWS = [
+    'posts:index',
+    'posts:group_list',
+    'posts:profile',
+    'posts:post_detail',
+]
+PAGE_CACHE_BYPASS_COOKIES = ['sessionid', 'messages']
+
+ENTITY_CACHE_SECONDS = 5 * 60
+ENTITY_CACHE_LOCAL_SIZE = 512
+ENTITY_CACHE_LOCAL_SECONDS = 5
+# Поля, которые кладутся в общий кэш; без пароля и почты.
+ENTITY_CACHE_FIELDS = {
+    'auth.user': ['username', 'first_name', 'last_name', 'is_active'],
+}
+ENTITY_NEGATIVE_SECONDS = 60
+ENTITY_BLOOM_FIELDS = {
+    'auth.user': 'username',
+    'posts.group': 'slug',
+}
+ENTITY_BLOOM_ERROR_RATE = 0.01
+ENTITY_BLOOM_MIN_CAPACITY = 1000
+ENTITY_BLOOM_REBUILD_SECONDS = 60
+POST_MAX_ID_SECONDS = 60
+NOT_FOUND_CACHE_SECONDS = 60 * 60
+
+COMPRESS_LEVEL = 6
+COMPRESS_MIN_SIZE = 1024
+COMPRESS_CONTENT_TYPES = [
+    'text/html',
+    'text/css',
+    'text/plain',
+    'text/javascript',
+    'application/javascript',
+    'application/json',
+    'application/xml',
+    'image/svg+xml',
+]
+
+# Счётчики лимитов хранятся в кэше: с LocMemCache у каждого процесса
+# свои, для общего лимита нужен общий кэш (memcached, Redis).
+RATELIMIT_ENABLED = True
+RATELIMITS = {
+    'post_create': {'user': '10/m', 'ip': '30/m'},
+    'add_comment': {'user': '20/m', 'ip': '60/m'},
+    'profile_follow': {'user': '30/m', 'ip': '60/m'},
+}
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -117,3 +249,10 @@ USE_L10N = True
 USE_TZ = True
 
 STATIC_URL = '/static/'
+STATIC_ROOT = os.path.join(BASE_DIR, 'static_root')
+STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+STATIC_COMPRESS_EXTENSIONS = [
+    '.css', '.js', '.svg', '.html', '.txt', '.json', '.xml', '.map',
+]
+STATIC_COMPRESS_MAX_RATIO = 0.95
+STATIC_MAX_AGE = 60
@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.urls import include, path
 from django.conf import settings
-from django.conf.urls.static import static
+
+from core.views import serve_media
 
 
 urlpatterns = [
@@ -10,6 +11,11 @@ urlpatterns = [
     path('auth/', include('users.urls', namespace='auth_users')),
     path('auth/', include('django.contrib.auth.urls')),
     path('about/', include('about.urls', namespace='about')),
+    path(
+        f'{settings.MEDIA_URL.strip("/")}/<path:path>',
+        serve_media,
+        name='media'
+    ),
 ]
 
 handler404 = 'core.views.page_not_found'
@@ -18,7 +24,4 @@ handler403 = 'core.views.csrf_failure'
 if settings.DEBUG:
     import debug_toolbar
 
-    urlpatterns += static(
-        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
-    )
-    urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
\ No newline at end of file
+    urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)